@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# name:   compare.py
+# author: nbehrnd@yahoo.com
+# date:   [2026-10-18 Sun]
+# edit:
+#
+"""Compare two JSON records of `run_benchmarks.py`.
+
+For each case and size of corpus present in both records, the script
+reports the throughput (lines/s) of the baseline and of the candidate,
+and their ratio.  Ratios below the threshold are marked as regression.
+
+python benchmarks/compare.py baseline.json candidate.json [--threshold 0.9]
+"""
+
+import argparse
+import json
+
+
+def load(file: str) -> tuple[str, dict[tuple[str, int], dict]]:
+    """Read a record, indexed by case and number of lines."""
+    with open(file, mode="r", encoding="utf-8") as source:
+        report = json.load(source)
+    results = {(entry["case"], entry["lines"]): entry for entry in report["results"]}
+    return report["version"], results
+
+
+def get_args():
+    """Collect command-line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.9,
+        help="ratio of throughput below which to report a regression",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Join the functions."""
+    args = get_args()
+    old_version, old = load(args.baseline)
+    new_version, new = load(args.candidate)
+
+    print(f"{'case':26s} {'lines':>9s} {old_version:>14s} {new_version:>14s}  ratio")
+    for key in sorted(set(old) & set(new)):
+        before = old[key]["lines_per_s"]
+        after = new[key]["lines_per_s"]
+        ratio = after / before
+        flag = "  regression" if ratio < args.threshold else ""
+        print(
+            f"{key[0]:26s} {key[1]:9d} {before:14.0f} {after:14.0f} {ratio:6.2f}{flag}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# name:   corpus.py
+# author: nbehrnd@yahoo.com
+# date:   [2026-10-18 Sun]
+# edit:
+#
+"""Generate a synthetic corpus of Murcko scaffolds as SMILES strings.
+
+The scaffolds resemble the ones DataWarrior exports: one to four ring
+systems (benzene, pyridine, thiophene, indole, cyclohexane, ...) joined
+by linkers (methylene, amide, ether, sulfonamide, (E)/(Z) double bonds,
+...).  Three parameters shape the corpus:
+
++ the aromatic ratio, i.e. the share of rings written in lower case;
++ the bracket density, i.e. the probability a ring or a linker carries
+  an atom in square brackets (e.g., `[nH]`, `[C@@H]`, `[N+]`, `[Sn]`);
++ the duplicate rate, i.e. the share of lines repeating a scaffold
+  already written (with a preference for the frequent ones).
+
+Usage from the root of the repository, e.g.
+
+python benchmarks/corpus.py --lines 1000000 -o corpus_1M.smi
+
+The same seed yields the same corpus.
+"""
+
+import argparse
+import random
+from typing import Iterator
+
+# Rings with `{0}` as placeholder of the ring closure digit; an aromatic
+# and an aliphatic form each.
+RINGS = [
+    ("c{0}ccccc{0}", "C{0}CCCCC{0}"),
+    ("c{0}ccncc{0}", "C{0}CCNCC{0}"),
+    ("c{0}ccsc{0}", "C{0}CCSC{0}"),
+    ("c{0}ccoc{0}", "C{0}CCOC{0}"),
+    ("c{0}cncnc{0}", "C{0}CNCNC{0}"),
+    ("c{0}ccc2ccccc2c{0}", "C{0}CCC2CCCCC2C{0}"),
+    ("c{0}ccc2[nH]ccc2c{0}", "C{0}CCC2NCCC2C{0}"),
+    ("c{0}nc2ccccc2s{0}", "C{0}NC2CCCCC2S{0}"),
+    ("c{0}cc[nH]c{0}", "C{0}CCNC{0}"),
+    ("c{0}ccc(cc{0})", "C{0}CCC(CC{0})"),
+]
+
+# Variants of a ring with an atom in square brackets.
+BRACKET_RINGS = [
+    "c{0}cc[nH]c{0}",
+    "c{0}cc[n+]cc{0}",
+    "C{0}C[C@@H](CC{0})",
+    "c{0}c[Sn]cc{0}",
+    "O=C{0}C[C@H](N{0})",
+    "c{0}ccc([O-])cc{0}",
+]
+
+LINKERS = [
+    "",
+    "C",
+    "CC",
+    "C(=O)N",
+    "NC(=O)",
+    "O",
+    "S(=O)(=O)N",
+    "/C=C/",
+    "/N=N/",
+    "C#C",
+    "N",
+    "C(=O)",
+]
+
+BRACKET_LINKERS = ["[C@@H](C)", "[N+](C)(C)", "[Si](C)(C)", "[S@](=O)", "[13CH2]"]
+
+
+def generate_scaffold(
+    rng: random.Random, aromatic_ratio: float, bracket_density: float
+) -> str:
+    """Generate one scaffold of one to four rings joined by linkers."""
+    pieces = []
+    for number in range(1, rng.randint(1, 4) + 1):
+        if number > 1:
+            if rng.random() < bracket_density:
+                pieces.append(rng.choice(BRACKET_LINKERS))
+            else:
+                pieces.append(rng.choice(LINKERS))
+        if rng.random() < bracket_density:
+            ring = rng.choice(BRACKET_RINGS)
+        else:
+            aromatic, aliphatic = rng.choice(RINGS)
+            ring = aromatic if rng.random() < aromatic_ratio else aliphatic
+        # ring closure digits 2 and 3 are reserved for fused systems
+        pieces.append(ring.format(number if number < 2 else number + 2))
+    return "".join(pieces)
+
+
+def generate_corpus(
+    lines: int,
+    aromatic_ratio: float = 0.7,
+    bracket_density: float = 0.1,
+    duplicate_rate: float = 0.5,
+    seed: int = 42,
+) -> Iterator[str]:
+    """Yield the SMILES strings of a corpus, one per line.
+
+    Repeated scaffolds are drawn from the ones already generated, with a
+    preference for the early (thus, the frequent) ones."""
+    rng = random.Random(seed)
+    pool: list[str] = []
+    for _ in range(lines):
+        if pool and rng.random() < duplicate_rate:
+            yield pool[int(len(pool) * rng.random() ** 3)]
+            continue
+        scaffold = generate_scaffold(rng, aromatic_ratio, bracket_density)
+        if len(pool) < 100_000:
+            pool.append(scaffold)
+        yield scaffold
+
+
+def write_corpus(file: str, lines: int, **parameters) -> None:
+    """Write a corpus into a file, one SMILES string per line."""
+    with open(file, mode="w", encoding="utf-8") as newfile:
+        batch = []
+        for smiles in generate_corpus(lines, **parameters):
+            batch.append(smiles)
+            if len(batch) == 10_000:
+                newfile.write("\n".join(batch) + "\n")
+                batch = []
+        if batch:
+            newfile.write("\n".join(batch) + "\n")
+
+
+def get_args():
+    """Collect command-line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1000, help="default: 1000")
+    parser.add_argument(
+        "--aromatic", type=float, default=0.7, help="aromatic ratio (default: 0.7)"
+    )
+    parser.add_argument(
+        "--brackets",
+        type=float,
+        default=0.1,
+        help="bracket-atom density (default: 0.1)",
+    )
+    parser.add_argument(
+        "--duplicates",
+        type=float,
+        default=0.5,
+        help="duplicate rate (default: 0.5)",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="default: 42")
+    parser.add_argument(
+        "-o", "--output", default="corpus.smi", help="default: corpus.smi"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Join the functions."""
+    args = get_args()
+    write_corpus(
+        args.output,
+        args.lines,
+        aromatic_ratio=args.aromatic,
+        bracket_density=args.brackets,
+        duplicate_rate=args.duplicates,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# name:   run_benchmarks.py
+# author: nbehrnd@yahoo.com
+# date:   [2026-10-18 Sun]
+# edit:
+#
+"""Time the saturation of synthetic corpora of Murcko scaffolds.
+
+For each size of corpus (by default 1k, 1M, and 10M lines, see
+`corpus.py`), the suite times
+
++ `process_smiles` and `saturate_list` on SMILES held in memory, and
+  `process_smiles_bytes` on the same held as bytes;
++ the sequential chain `process_smiles_sequential`, and each of its
+  functions `saturate_bonds`, `saturate_carbon`, ... individually;
++ `process_input_files` reading the corpus file (output to /dev/null);
++ the CLI end to end, i.e. `python -m ... corpus.smi > /dev/null`.
+
+Each case runs in a process of its own to report its peak resident set
+size.  The results (lines/s, MB/s, peak RSS) are printed as a table and
+saved as JSON; compare two of these files with `compare.py`.
+
+Usage from the root of the repository, e.g.
+
+python benchmarks/run_benchmarks.py --sizes 1k 1M --json results.json
+
+The complete default set takes a couple of minutes, foremost because
+of the sequential chain about 10M lines.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess as sub
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import corpus  # noqa: E402
+from saturate_murcko_scaffolds import saturate_murcko_scaffolds as sms  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # pragma: no cover, e.g. on Windows
+    resource = None  # type: ignore[assignment]
+
+IN_MEMORY = {
+    "process_smiles": sms.process_smiles,
+    "process_smiles_sequential": sms.process_smiles_sequential,
+    "saturate_bonds": sms.saturate_bonds,
+    "saturate_carbon": sms.saturate_carbon,
+    "saturate_nitrogen": sms.saturate_nitrogen,
+    "saturate_oxygen": sms.saturate_oxygen,
+    "saturate_phosphorus": sms.saturate_phosphorus,
+    "saturate_sulfur": sms.saturate_sulfur,
+}
+STREAMING = ["process_input_files", "cli"]
+CASES = list(IN_MEMORY) + ["process_smiles_bytes", "saturate_list"] + STREAMING
+
+
+def parse_size(text: str) -> int:
+    """Read a number of lines like `1000`, `1k`, or `10M`."""
+    factors = {"k": 1_000, "M": 1_000_000}
+    if text[-1] in factors:
+        return int(text[:-1]) * factors[text[-1]]
+    return int(text)
+
+
+def peak_rss_mb(who: int) -> float | None:
+    """Report the peak resident set size in MB, if available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports kB, macOS bytes
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / (1 << 10)
+
+
+def run_case(case: str, file: str) -> dict:
+    """Time one case about the corpus file, in this process.
+
+    Only the cases on SMILES in memory read the corpus into a list; for
+    the others, the lines are merely counted, thus the peak RSS is the
+    one of reading the file as a stream."""
+    listing: list[str] = []
+    with open(file, mode="r", encoding="utf-8") as source:
+        if case in STREAMING:
+            lines = sum(1 for _ in source)
+        else:
+            listing = [line.strip() for line in source]
+            lines = len(listing)
+    encoded = [smiles.encode() for smiles in listing] if "bytes" in case else []
+
+    start = time.perf_counter()
+    if case in IN_MEMORY:
+        function = IN_MEMORY[case]
+        for smiles in listing:
+            function(smiles)
+    elif case == "process_smiles_bytes":
+        for data in encoded:
+            sms.process_smiles_bytes(data)
+    elif case == "saturate_list":
+        for offset in range(0, len(listing), sms.BATCH_SIZE):
+            sms.saturate_list(listing[offset : offset + sms.BATCH_SIZE])
+    elif case == "process_input_files":
+        with open(os.devnull, mode="w", encoding="utf-8") as devnull:
+            with contextlib.redirect_stdout(devnull):
+                sms.process_input_files([file])
+    elif case == "cli":
+        environment = dict(os.environ, PYTHONPATH=os.path.join(ROOT, "src"))
+        command = [sys.executable, "-m", sms.__name__, file]
+        sub.run(command, stdout=sub.DEVNULL, check=True, env=environment)
+    elapsed = time.perf_counter() - start
+
+    who = resource.RUSAGE_CHILDREN if case == "cli" and resource else 0
+    return {
+        "case": case,
+        "lines": lines,
+        "seconds": elapsed,
+        "peak_rss_mb": peak_rss_mb(who) if resource else None,
+    }
+
+
+def get_args():
+    """Collect command-line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        default=["1k", "1M", "10M"],
+        help="numbers of lines of the corpora (default: 1k 1M 10M)",
+    )
+    parser.add_argument(
+        "--cases", nargs="+", default=CASES, choices=CASES, help="default: all"
+    )
+    parser.add_argument("--aromatic", type=float, default=0.7)
+    parser.add_argument("--brackets", type=float, default=0.1)
+    parser.add_argument("--duplicates", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--json", default="benchmark.json", help="default: benchmark.json"
+    )
+    parser.add_argument("--run-case", nargs=2, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Join the functions."""
+    args = get_args()
+    if args.run_case:
+        print(json.dumps(run_case(*args.run_case)))
+        return
+
+    parameters = {
+        "aromatic_ratio": args.aromatic,
+        "bracket_density": args.brackets,
+        "duplicate_rate": args.duplicates,
+        "seed": args.seed,
+    }
+    results = []
+    print(f"{'case':26s} {'lines':>9s} {'lines/s':>12s} {'MB/s':>8s} {'RSS/MB':>8s}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            file = os.path.join(directory, f"corpus_{size}.smi")
+            corpus.write_corpus(file, parse_size(size), **parameters)
+            megabytes = os.path.getsize(file) / 1e6
+            for case in args.cases:
+                command = [sys.executable, __file__, "--run-case", case, file]
+                output = sub.run(command, capture_output=True, text=True, check=True)
+                result = json.loads(output.stdout)
+                result["lines_per_s"] = result["lines"] / result["seconds"]
+                result["mb_per_s"] = megabytes / result["seconds"]
+                results.append(result)
+                rss = result["peak_rss_mb"]
+                print(
+                    f"{case:26s} {result['lines']:9d} {result['lines_per_s']:12.0f}"
+                    f" {result['mb_per_s']:8.2f}"
+                    f" {'n/a' if rss is None else format(rss, '8.1f'):>8s}"
+                )
+
+    report = {
+        "version": version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": parameters,
+        "results": results,
+    }
+    with open(args.json, mode="w", encoding="utf-8") as newfile:
+        json.dump(report, newfile, indent=2)
+    print(f"results saved in {args.json}")
+
+
+def version() -> str:
+    """Identify the version benchmarked, by the git commit if possible."""
+    try:
+        output = sub.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True,
+            text=True,
+            cwd=ROOT,
+        )
+    except OSError:
+        return "unknown"
+    return output.stdout.strip() or "unknown"
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@
 # name:   saturate_murcko_scaffolds.py
 # author: nbehrnd@yahoo.com
 # date:   [2019-06-07 Fri]
-# edit:   [2025-07-20 Sun]
+# edit:   [2026-10-18 Sun]
 #
 """Read Smiles of Murcko scaffolds and return these as 'saturated'.
 
@@ -26,8 +26,12 @@ the SMILES to work with as mandatory parameter:
 
 python saturate_murcko_scaffolds.py [example.txt]
 
-Results are written into file example_sat.txt.  Only SMILES with one
-or zero pairs of square brackets (e.g., [Sn], [S@], [Fe3+]) are touched.
+An input file `-` (or none at all) reads the listing from stdin, e.g.
+`zcat example.smi.gz | python saturate_murcko_scaffolds.py - | sort -u`.
+Results are reported to the CLI, or -- with the optional parameter
+`--output` -- written into file example_sat.smi.  Atoms in square
+brackets (e.g., [Sn], [S@], [Fe3+], [nH+]) are parsed one by one, any
+number of them per SMILES.
 
 [1] Bemis GW, Murcko MA J. Med. Chem. 1996, 39, 2887-2893, doi
     10.1021/jm9602928.
@@ -38,42 +42,577 @@ or zero pairs of square brackets (e.g., [Sn], [S@], [Fe3+]) are touched.
 
 License: Norwid Behrnd, 2019--2025, GPLv3.
 """
-import argparse
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import functools
+import io
+import itertools
 import os
-import re
+import sys
+import time
+
+# Modules only some of the options need are imported on first use, and
+# the regular expressions compiled on first use; this keeps the start of
+# the CLI short (confer `test_import_time` about the budget).
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import argparse
+    import asyncio
+    import re
+    from collections.abc import (
+        Callable,
+        Container,
+        Generator,
+        Iterable,
+        Iterator,
+        Sequence,
+    )
+    from concurrent.futures import Future, ProcessPoolExecutor
+    from types import CodeType
+    from typing import IO, Any, BinaryIO, TextIO, TypeVar
+
+    T = TypeVar("T")
+
+# Version of the saturation rules; increase it if the results change,
+# which invalidates the persistent caches of earlier results.
+ENGINE_VERSION = 2
+
+BOND_SYMBOLS = "=#/\\"
+
+# Elements written in lower case as an implicit description of the
+# aromatic bond order, with their names.  To support an other element
+# (e.g., `si`) add a row; the functions below, including the passes of
+# the sequential chain, are derived from this table.  Symbols of two
+# letters only occur in square brackets.
+AROMATIC_ELEMENTS = {
+    "b": "boron",
+    "c": "carbon",
+    "n": "nitrogen",
+    "o": "oxygen",
+    "p": "phosphorus",
+    "s": "sulfur",
+    "as": "arsenic",
+    "se": "selenium",
+    "sn": "tin",
+    "te": "tellurium",
+}
+AROMATIC_SYMBOLS = "".join(symbol for symbol in AROMATIC_ELEMENTS if len(symbol) == 1)
+
+# Elements which may be written without square brackets.
+ORGANIC_SUBSET = ("B", "C", "N", "O", "P", "S", "F", "Cl", "Br", "I")
+
+# Outside of square brackets, saturation is a mere character translation.
+_SATURATION_TABLE = str.maketrans(
+    AROMATIC_SYMBOLS, AROMATIC_SYMBOLS.upper(), BOND_SYMBOLS
+)
+_BOND_DELETION = str.maketrans("", "", BOND_SYMBOLS)
+
+# Levels of reduction reported by function `process_smiles_levels`: the
+# Murcko scaffold as given, its saturated form, and the generic skeleton.
+LEVELS = ("scaffold", "saturated", "skeleton")
+
+# In the skeleton, each atom of the organic subset is a carbon atom, and
+# each bond a single one.  (Outside of square brackets, `l` and `r` only
+# occur in Cl and Br.)
+_SKELETON_TABLE = str.maketrans("BNOPSFIbcnops", "C" * 13, "lr-=#$:/\\")
+
+# Stages of the transformation selectable (confer `compile_stages`): the
+# saturation, and the removal of stereo markers, isotopes, charges, and
+# explicit hydrogen counts.
+STAGES = ("saturate", "stereo", "isotopes", "charges", "hydrogens")
+
+# Ring closure labels (outside of square brackets, which the split keeps
+# apart), and the size of the hash of a SMILES string (64 bits).
+_RING_LABEL = r"(\[[^\[\]\n]*\]?|%\d\d|\d)"
+HASH_BYTES = 8
+_DIGITS_ONLY = str.maketrans(
+    "", "", "".join(chr(code) for code in range(128) if not chr(code).isdigit())
+)
+
+# One bracket atom, possibly lacking the closing bracket; the split keeps it.
+_BRACKET_ATOM = r"(\[[^\[\]\n]*\]?)"
+
+# The content of a bracket atom: isotope, element symbol (aromatic ones in
+# lower case), chirality, hydrogen count, charge, and atom class.
+_BRACKET_CONTENT = (
+    r"(\d*)([A-Z][a-z]?|[a-z][a-z]?|\*)"
+    r"(@(?:@|TH[12]|AL[12]|SP[123]|TB\d\d?|OH\d\d?)?)?"
+    r"(H\d?)?(\+(?:\d+|\+)?|-(?:\d+|-)?)?(:\d+)?"
+)
+
+# Deleting the atoms of the organic subset and the bonds of a SMILES string
+# freed of its bracket atoms leaves its branches and ring closures, the
+# "signature" checked by options `--strict` and `--lenient`.  The segments
+# between bracket atoms are joined by NUL characters, deleted as well.
+_SIGNATURE_DELETION = str.maketrans("", "", "BCNOPSFIlrbcnops*-=#$:/\\.\0")
+
+# A bond symbol (outside of square brackets) at the start or the end of a
+# SMILES string or of a fragment, next to an other bond, or prior to a
+# branch; e.g. `#c1ccccc1` (a comment), `C==C`, `C=(O)`.
+_MISPLACED_BOND = r"(?m)^[-=#$:/\\]|[-=#$:/\\](?:$|[-=#$:/\\().])|\.[-=#$:/\\]"
+
+# The same about listings processed as bytes rather than as text.
+_BYTE_SATURATION_TABLE = bytes.maketrans(
+    AROMATIC_SYMBOLS.encode(), AROMATIC_SYMBOLS.upper().encode()
+)
+_BOND_BYTES = BOND_SYMBOLS.encode()
+_BRACKET_ATOM_BYTES = rb"(\[[^\[\]\n]*\]?)"
+_SPACING_BYTES = rb"[ \t\r\v\f]"
+
+# Input files are read in blocks of complete lines of about this many
+# characters; the permanent record is written with a buffer of this size.
+READ_BLOCK_SIZE = 1 << 20
+WRITE_BUFFER_SIZE = 1 << 20
+
+# SMILES strings joined into one buffer by function `saturate_many`.
+BATCH_SIZE = 4096
+
+# Tables by the extension of their file name; others are tab-separated.
+TABLE_FORMATS = {".csv": "csv", ".dwar": "dwar", ".tsv": "tsv", ".txt": "tsv"}
+
+# Distinct saturated SMILES counted in memory prior to a sorted run on disk.
+MAX_UNIQUE = 1_000_000
+
+# Compressed files, recognized by the extension of their file name, or
+# else by their first bytes.  zstd requires Python 3.14, or zstandard.
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd"}
+COMPRESSION_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+COMPRESSORS = {"gzip": "gzip", "bz2": "bz2", "xz": "lzma"}  # their modules
+
+# Blocks a thread decompressing an input file reads ahead of saturation.
+READ_AHEAD = 4
+
+# Name of the input file read from stdin.
+STDIN = "-"
+
+# Exit status of a filter whose output pipe was closed (128 + SIGPIPE).
+EXIT_BROKEN_PIPE = 141
+
+# Requests of a server with at least this many SMILES strings are passed
+# to its pool of processes; smaller ones are answered by the event loop.
+SERVER_OFFLOAD = BATCH_SIZE
+
+# Longest request (in bytes) a server accepts, and the default number of
+# requests of one client in progress at a time.
+SERVER_LINE_LIMIT = 1 << 24
+SERVER_CONCURRENCY = 64
+
+
+# Options of the CLI (by their destination) which do not apply together:
+# each lists the ones set up earlier it excludes, confer `get_args`.  The
+# positional inputs are named `inputs`, and `--strict`/`--lenient` share
+# `validation`.
+_RESULT_SHAPE = ("levels", "stages", "renumber", "hash")
+_TALLY = ("unique", "counts", "first_line")
+OPTION_CONFLICTS = {
+    "incremental": (*_TALLY, "validation"),
+    "first_line": ("validation",),
+    "column": (*_TALLY, "jobs", "validation", "incremental"),
+    "mmap": (
+        "cache_size",
+        "cache_file",
+        *_TALLY,
+        "validation",
+        "incremental",
+        "column",
+    ),
+    "levels": (
+        "column",
+        "incremental",
+        "validation",
+        "cache_size",
+        "cache_file",
+        "mmap",
+    ),
+    "stages": ("levels", "column", "incremental", "validation", "cache_file", "mmap"),
+    "renumber": ("levels", "column", "incremental", "cache_file", "mmap"),
+    "hash": ("levels", "column", "incremental", "cache_file", "mmap"),
+    "index": ("levels", "column", "incremental", "validation", "hash", "mmap"),
+    "lookup": (
+        "output",
+        "jobs",
+        "cache_size",
+        "cache_file",
+        *_TALLY,
+        "validation",
+        *_RESULT_SHAPE,
+        "index",
+        "incremental",
+        "mmap",
+        "column",
+    ),
+    "serve": (
+        "inputs",
+        "output",
+        *_TALLY,
+        "validation",
+        *_RESULT_SHAPE,
+        "index",
+        "lookup",
+        "incremental",
+        "mmap",
+        "column",
+    ),
+}
+OPTION_CONFLICTS["socket"] = OPTION_CONFLICTS["serve"]
 
-# import sys
+# Options of the CLI which only apply together with one of others.
+OPTION_REQUIREMENTS = {
+    "compress": ("output", "incremental"),
+    "errors": ("validation",),
+    "max_unique": _TALLY,
+    "format": ("column",),
+    "concurrency": ("serve", "socket"),
+}
 
 
 def get_args(arg_list: list[str] | None):
     """Collect command-line arguments."""
+    import argparse
 
     parser = argparse.ArgumentParser(
-        description="""Reading a list of SMILES, the script reports
-        'saturated' Murcko scaffolds as a list of SMILES.  The script
-        processes SMILES strings only if these contain one or zero pairs
-        of square brackets (e.g., [Sn], [S@], [Fe3+]) and only works on
-        elements C, N, O, P, and S (often written in lower case as an
-        implicit description of the aromatic bond order) and explicit
-        double/triple bonds.  To prevent potential errors, the square
-        brackets are copied verbatim into the newly written SMILES
-        string. Enclose SMILES provided via the command line in quotes,
-        or some characters permissible in a SMILES string can launch an
-        unwanted action."""
+        description=f"""Reading a list of SMILES, the script reports
+        'saturated' Murcko scaffolds as a list of SMILES: explicit
+        double/triple bonds and (E)/(Z) markers are removed, and
+        aromatic atoms written in lower case ({", ".join(AROMATIC_ELEMENTS)})
+        are capitalized.  Atoms in square brackets (e.g., [Sn], [S@],
+        [Fe3+], [nH+]) are parsed one by one, any number of them per
+        SMILES; their aromatic symbol is capitalized, while isotope,
+        chirality, hydrogen count, charge and atom class are kept unless
+        removed by `--stages`.  Enclose SMILES provided via the command
+        line in quotes, or some characters permissible in a SMILES
+        string can launch an unwanted action."""
     )
 
     parser.add_argument(
         "inputs",
-        nargs="+",
-        help="""
-One or multiple SMILES from the CLI, or a list by an input file""",
+        nargs="*",
+        help=f"""
+One or multiple SMILES from the CLI, or a list by an input file;
+`{STDIN}` (or none, unless stdin is a terminal) reads the list from stdin""",
+    )
+
+    parser.add_argument(
+        "-o",
+        "--output",
+        action="store_true",
+        help="""Write the results about an input file `example.smi` into
+        file `example_sat.smi` rather than to the CLI.""",
+    )
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="""Number of processes to share the work on input files
+        (default: 1).  With 0, one process per CPU core is used.""",
+    )
+
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=0,
+        metavar="N",
+        help="""Keep up to N saturated SMILES in a cache to skip repeated
+        scaffolds (default: 0, no cache).  If the cache is full, the
+        least recently used entry is dropped.  Hits and misses are
+        reported to stderr.""",
+    )
+
+    parser.add_argument(
+        "--cache-file",
+        metavar="PATH",
+        help="""Keep the saturated SMILES in an SQLite database which
+        persists across runs; later runs only compute new scaffolds.
+        The file is emptied if the saturation rules change.  With
+        `--cache-size`, a cache in memory is put in front.""",
+    )
+
+    parser.add_argument(
+        "--index",
+        metavar="PATH",
+        help="""While saturating, write an index of the input files into
+        this SQLite database: each saturated SMILES with the input
+        files and line numbers (from 1 on) yielding it.  An earlier
+        index of this path is replaced once the new one is complete.""",
+    )
+
+    parser.add_argument(
+        "--lookup",
+        metavar="PATH",
+        help="""Rather than processing inputs, look up the SMILES given
+        (or listed in the input files) in the index of this path.  Each
+        is saturated as the index was built; each input line yielding
+        the same result is reported as `SMILES<tab>file<tab>line`.""",
+    )
+
+    parser.add_argument(
+        "-u",
+        "--unique",
+        action="store_true",
+        help="""Report each distinct saturated SMILES only once, sorted
+        alphabetically, instead of one result per input.""",
+    )
+
+    parser.add_argument(
+        "-c",
+        "--counts",
+        action="store_true",
+        help="""As `--unique`, with the number of occurrences of the
+        saturated SMILES in a second, tab-separated column.""",
+    )
+
+    parser.add_argument(
+        "--first-line",
+        action="store_true",
+        help="""As `--unique`, with the first input line yielding the
+        saturated SMILES in two additional columns: the input file (or
+        `argument`, about the SMILES of the CLI), and the number of the
+        line in it.  This does not apply together with `--strict`, or
+        `--lenient`, which skip lines.""",
+    )
+
+    parser.add_argument(
+        "--max-unique",
+        type=int,
+        default=MAX_UNIQUE,
+        metavar="N",
+        help=f"""Number of distinct saturated SMILES held in memory by
+        `--unique`; beyond, sorted runs are moved into temporary files
+        and merged at the end (default: {MAX_UNIQUE}).""",
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="""As `--output`, but only process the lines appended to
+        an input file since the last run, and append their results to
+        the file `example_sat.smi`.  The progress is kept in a file
+        `example_sat.smi.state`; if the part of the input file
+        processed earlier was altered, it is processed in full.""",
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="""Report the calls, time, characters in and out, and lines
+        of the processing (read, cache, saturate, tally,
+        write) to stderr.""",
+    )
+
+    parser.add_argument(
+        "--profile-format",
+        choices=["table", "json"],
+        help="""Format of the report of `--profile`, which it implies:
+        a table (default), or JSON.""",
+    )
+
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="""Read input files by memory map, and process them as
+        bytes rather than as text; for large ASCII listings.  This does
+        not apply together with the options of the processing as text:
+        `--cache-size`, `--cache-file`, `--unique`, `--counts`,
+        `--first-line`, `--strict`, `--lenient`, `--levels`, `--stages`,
+        `--renumber`, `--hash`, `--index`, `--incremental`, or
+        `--column`.""",
+    )
+
+    validation = parser.add_mutually_exclusive_group()
+    validation.add_argument(
+        "--strict",
+        dest="validation",
+        action="store_const",
+        const="strict",
+        help="""Check each line of the input files to be one SMILES string
+        (characters of the SMILES alphabet, bond symbols between atoms,
+        balanced square brackets and parentheses, paired ring closures)
+        while saturating it.  Lines failing are skipped, and reported
+        with their line number to stderr (or the file of `--errors`).""",
+    )
+    validation.add_argument(
+        "--lenient",
+        dest="validation",
+        action="store_const",
+        const="lenient",
+        help="""As `--strict`, but skip blank lines and comments (`#`)
+        silently, and drop a name or ID after the SMILES string.""",
+    )
+
+    parser.add_argument(
+        "--errors",
+        metavar="FILE",
+        help="""Report the lines rejected by `--strict`, or `--lenient`,
+        into this file rather than to stderr.""",
+    )
+
+    parser.add_argument(
+        "--levels",
+        type=parse_levels,
+        metavar="LEVEL,...",
+        help=f"""Report several levels of reduction per SMILES at once,
+        as tab-separated columns in the sequence given, choosing from
+        {", ".join(LEVELS)}: the SMILES as given, the saturated one, and
+        the generic skeleton (each heavy atom carbon, each bond single).
+        E.g., `--levels scaffold,saturated,skeleton`.""",
+    )
+
+    parser.add_argument(
+        "--stages",
+        type=parse_stages,
+        metavar="STAGE,...",
+        help=f"""Transformations applied in one pass, choosing from
+        {", ".join(STAGES)} (default: saturate): the saturation, and the
+        removal of stereo markers (`@`, `@@`, `/`, `\\`), isotopes,
+        charges, and explicit hydrogen counts in square brackets.  An
+        atom reduced to a bare symbol of the organic subset loses its
+        brackets.  E.g., `--stages saturate,stereo,charges`.""",
+    )
+
+    parser.add_argument(
+        "--renumber",
+        action="store_true",
+        help="""Renumber the ring closures of each result in order of
+        appearance (e.g., `C2CCCCC2` -> `C1CCCCC1`), a cheap
+        normalization prior to grouping.""",
+    )
+
+    parser.add_argument(
+        "--hash",
+        action="store_true",
+        help=f"""Append a tab-separated column with a {8 * HASH_BYTES}-bit
+        hash (BLAKE2b) of each result as hexadecimal number of fixed
+        width, a key to shard or join large listings by.""",
     )
 
-    args = parser.parse_args(arg_list)
+    parser.add_argument(
+        "--compress",
+        choices=["gzip", "bz2", "xz", "zstd"],
+        help="""Compress the files written with `--output`, e.g. into
+        `example_sat.smi.gz`.  Compressed input files (`.gz`, `.bz2`,
+        `.xz`, `.zst`) are read without this option.""",
+    )
+
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="""Run as a server rather than processing inputs: each line
+        read from stdin (or from a client of `--socket`) with one or
+        more SMILES separated by white space is answered by a line of
+        the saturated SMILES, separated by tabulators.  Requests may
+        be pipelined; their answers keep the sequence.""",
+    )
+
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="""As `--serve`, but listen to clients at a Unix domain
+        socket of this path rather than to stdin and stdout.""",
+    )
+
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=SERVER_CONCURRENCY,
+        metavar="N",
+        help=f"""Number of requests of one client of the server in
+        progress at a time; further ones wait (default:
+        {SERVER_CONCURRENCY}).  Large requests are shared among the
+        processes set by `--jobs`.""",
+    )
+
+    parser.add_argument(
+        "--column",
+        metavar="NAME",
+        help="""Process input files as tables, with the SMILES in the
+        column of this name (or number, counting from 1) of the first
+        row.  A column of saturated SMILES is appended, all other
+        columns are passed on.""",
+    )
+
+    parser.add_argument(
+        "--format",
+        choices=["tsv", "csv", "dwar"],
+        help="""Format of the tables read with `--column`: tab-separated,
+        comma-separated, or DataWarrior's .dwar.  By default, it is
+        set by the extension of the file (`.csv`, `.dwar`, otherwise
+        tab-separated).""",
+    )
+
+    args = parser.parse_intermixed_args(arg_list)
+    if args.stages == ("saturate",):
+        args.stages = None
+    given = {
+        dest
+        for dest, value in vars(args).items()
+        if value is not None
+        and value is not False
+        and value != []
+        and value != parser.get_default(dest)
+    }
+    for option, excluded in OPTION_CONFLICTS.items():
+        if option in given and given.intersection(excluded):
+            conflicts = ", ".join(
+                _option_name(dest) for dest in excluded if dest in given
+            )
+            parser.error(f"{_option_name(option)} does not apply to {conflicts}")
+    for option, needed in OPTION_REQUIREMENTS.items():
+        if option in given and not given.intersection(needed):
+            names = ", ".join(_option_name(dest) for dest in needed)
+            parser.error(f"{_option_name(option)} only applies to {names}")
+    if not args.inputs and not (args.serve or args.socket):
+        if sys.stdin is None or sys.stdin.isatty():
+            parser.error("the following arguments are required: inputs")
+        args.inputs = [STDIN]
+    if STDIN in args.inputs and args.incremental:
+        parser.error(f"--incremental does not apply to input {STDIN}")
 
     return args
 
 
+def _option_name(dest: str) -> str:
+    """Name an option of the CLI by its destination, e.g. in errors."""
+    if dest == "inputs":
+        return "inputs"
+    if dest == "validation":
+        return "--strict/--lenient"
+    return "--" + dest.replace("_", "-")
+
+
+def _parse_selection(text: str, choices: tuple[str, ...], kind: str) -> tuple[str, ...]:
+    """Read a comma-separated selection of choices, e.g. for the CLI."""
+    import argparse
+
+    selection = tuple(item.strip() for item in text.split(","))
+    unknown = [item for item in selection if item not in choices]
+    if unknown or not text:
+        raise argparse.ArgumentTypeError(
+            f"unknown {kind} {', '.join(unknown)!r}, choose from {', '.join(choices)}"
+        )
+    return selection
+
+
+def parse_levels(text: str) -> tuple[str, ...]:
+    """Read a comma-separated selection of `LEVELS`, e.g. for the CLI."""
+    return _parse_selection(text, LEVELS, "level")
+
+
+def parse_stages(text: str) -> tuple[str, ...]:
+    """Read a comma-separated selection of `STAGES`, e.g. for the CLI."""
+    return _parse_selection(text, STAGES, "stage")
+
+
 def saturate_bonds(input_smiles: str) -> str:
     """Remove explicit designation of higher bond orders.
 
@@ -94,6 +633,63 @@ def saturate_bonds(input_smiles: str) -> str:
     return processed
 
 
+@functools.cache
+def _compiled(expression: str) -> re.Pattern[str]:
+    """Compile a regular expression on first use."""
+    import re
+
+    return re.compile(expression)
+
+
+@functools.cache
+def _compiled_bytes(expression: bytes) -> re.Pattern[bytes]:
+    """Compile a regular expression about bytes on first use."""
+    import re
+
+    return re.compile(expression)
+
+
+def _saturate_bracket(token: str, symbols: Container[str]) -> str:
+    """Saturate one atom in square brackets if it is of an element listed.
+
+    The content of the brackets (bond symbols removed) is parsed once into
+    isotope, element symbol, chirality, hydrogen count, charge and atom
+    class (pattern `_BRACKET_CONTENT`).  An aromatic symbol listed is
+    capitalized, all other parts are kept; a bare aromatic atom of the
+    organic subset loses its brackets, e.g. `[c]` -> `C`.  Content which
+    does not parse is kept as it is.  A token lacking the closing bracket
+    is processed the same way, but keeps its bracket."""
+    closed = token.endswith("]") and len(token) > 1
+    content = token[1:-1] if closed else token[1:]
+    content = content.translate(_BOND_DELETION)
+
+    parts = _compiled(_BRACKET_CONTENT).fullmatch(content)
+    if parts is not None and parts[2] in symbols:
+        capital = parts[2].capitalize()
+        if closed and content == parts[2] and capital in ORGANIC_SUBSET:
+            return capital
+        content = content[: parts.start(2)] + capital + content[parts.end(2) :]
+    return f"[{content}]" if closed else f"[{content}"
+
+
+def saturate_element(input_string: str, symbol: str) -> str:
+    """Provide saturation of the atoms of one element of the table.
+
+    Outside of square brackets, the (one-letter) symbol is capitalized;
+    in square brackets, function `_saturate_bracket` applies about this
+    element only, e.g. `saturate_element("c1cc[cH-]c1", "c")`."""
+    tokens = _compiled(_BRACKET_ATOM).split(input_string)
+    if len(symbol) == 1:
+        tokens[0::2] = [
+            segment.replace(symbol, symbol.upper()) for segment in tokens[0::2]
+        ]
+    tokens[1::2] = [
+        _saturate_bracket(atom, (symbol,)) if symbol in atom else atom
+        for atom in tokens[1::2]
+    ]
+    return "".join(tokens)
+
+
 def saturate_carbon(input_string: str) -> str:
     """Provide saturation of carbon atoms.
 
@@ -105,130 +701,2421 @@ def saturate_carbon(input_string: str) -> str:
       `[sn]` about aromatic tin to `[SN]` -- which however now neither
       is non-aromatic tin `[Sn]`, nor follows the rule to enclose only
       one element into a pair of square brackets (you don't want to have
-      `S` sulfur and `N` instead). So the second rule prevents a
-      modification of `c` if `c` is used as second character of an element
-      symbol enclosed by a pair or square brackets.
-    + third, there may be formal charge on the atom of interest.  For now,
-      only single positive, and single negative are supported by the
-      algorithm.
+      `S` sulfur and `N` instead). Thus, the content of square brackets
+      is parsed, and only the element symbol is considered; the `c` of
+      `[Sc]`, or of `[Tc]` is not one of carbon.
+    + third, there may be formal charge on the atom of interest (e.g.,
+      `[cH-]`, `[n+2]`), or an isotope, chirality, hydrogen count, or
+      atom class; these are retained.
     """
-    processed = ""
-    new01 = re.sub(r"\[c\]", "C", input_string)  # `[c]` -> `C`
-    new02 = re.sub(r"(?<!\[[a-zA-Z])c(?!\])", "C", new01)
-    new03 = re.sub(r"\[c-\]", "[C-]", new02)
-    new04 = re.sub(r"\[c+\]", "[C+]", new03)
-
-    processed = new04
-    return processed
+    return saturate_element(input_string, "c")
 
 
 def saturate_nitrogen(input_string: str) -> str:
     """Saturation next to nitrogen atoms.
 
     The approach copies the one introduced on carbon, confer vide supra."""
-    processed = ""
-    new01 = re.sub(r"\[n\]", "N", input_string)  # `[n]` -> `N`
-    new02 = re.sub(r"(?<!\[[a-zA-Z])n(?!\])", "N", new01)
-    new03 = re.sub(r"\[n-\]", "[N-]", new02)
-    new04 = re.sub(r"\[n+\]", "[N+]", new03)
-
-    processed = new04
-    return processed
+    return saturate_element(input_string, "n")
 
 
 def saturate_oxygen(input_string: str) -> str:
     """Saturation next to oxygen atoms.
 
     The approach copies the one introduced on carbon, confer vide supra."""
-    processed = ""
-    new01 = re.sub(r"\[o\]", "O", input_string)  # `[o]` -> `O`
-    new02 = re.sub(r"(?<!\[[a-zA-Z])o(?!\])", "O", new01)
-    new03 = re.sub(r"\[o-\]", "[O-]", new02)
-    new04 = re.sub(r"\[o+\]", "[O+]", new03)
-
-    processed = new04
-    return processed
+    return saturate_element(input_string, "o")
 
 
 def saturate_phosphorus(input_string: str) -> str:
     """Saturation next to phosphorus atoms.
 
     The approach copies the one introduced on carbon, confer vide supra."""
-    processed = ""
-    new01 = re.sub(r"\[p\]", "P", input_string)  # `[p]` -> `P`
-    new02 = re.sub(r"(?<!\[[a-zA-Z])p(?!\])", "P", new01)
-    new03 = re.sub(r"\[p-\]", "[P-]", new02)
-    new04 = re.sub(r"\[p+\]", "[P+]", new03)
-
-    processed = new04
-    return processed
+    return saturate_element(input_string, "p")
 
 
 def saturate_sulfur(input_string: str) -> str:
     """Saturation next to sulfur atoms.
 
     The approach copies the one introduced on carbon, confer vide supra."""
-    processed = ""
-    new01 = re.sub(r"\[s\]", "S", input_string)  # `[s]` -> `S`
-    new02 = re.sub(r"(?<!\[[a-zA-Z])s(?!\])", "S", new01)
-    new03 = re.sub(r"\[s-\]", "[S-]", new02)
-    new04 = re.sub(r"\[s+\]", "[S+]", new03)
+    return saturate_element(input_string, "s")
+
+
+def process_smiles_sequential(smiles: str) -> str:
+    """Sequential reduction of a compound described by a SMILES string.
+
+    This is a chain of one pass about the bonds, followed by one pass
+    per element of table `AROMATIC_ELEMENTS`.  It rescans the string once
+    per element, and is retained to compare function `process_smiles`
+    with; as both parse bracket atoms by function `_saturate_bracket`,
+    the differential tests check them against a reference of their own."""
+    processed = saturate_bonds(smiles)
+    for symbol in AROMATIC_ELEMENTS:
+        processed = saturate_element(processed, symbol)
 
-    processed = new04
     return processed
 
 
-# def write_record(input_file, listing):
-#     """Provide the permanent record."""
-#     stem_input_file = os.path.splitext(input_file)[0]
-#     report_file = "".join([stem_input_file, "_sat.smi"])
-#
-#     try:
-#         with open(report_file, encoding="utf-8", mode="w") as newfile:
-#             for entry in listing:
-#                 newfile.write(f"{entry}\n")
-#     except OSError:
-#         print(f"System error while writing file {report_file}.  Exit.")
-#         sys.exit()
+@functools.lru_cache(maxsize=4096)
+def saturate_bracket_atom(token: str) -> str:
+    """Saturate one atom enclosed in square brackets.
+
+    The rules are the ones of the sequential chain about all elements of
+    table `AROMATIC_ELEMENTS` (confer function `_saturate_bracket`):
+    + `[b]`, `[c]`, `[n]`, `[o]`, `[p]`, `[s]` lose their brackets and
+      are capitalized, e.g. `[n]` -> `N`.
+    + otherwise, an aromatic symbol of the table is capitalized, e.g.
+      `[nH+]` -> `[NH+]`, `[13c]` -> `[13C]`, `[se]` -> `[Se]`, while
+      other element symbols are kept (e.g., `[Sc]`, `[Sn]`).
+    The parse is cached; bracket atoms recur often in a listing."""
+    return _saturate_bracket(token, AROMATIC_ELEMENTS)
+
+
+@functools.lru_cache(maxsize=4096)
+def skeleton_bracket_atom(token: str) -> str:
+    """Reduce one atom enclosed in square brackets to the skeleton's carbon.
+
+    Isotope, chirality, hydrogens, charge, and atom class are dropped with
+    the brackets, e.g. `[13nH+]` -> `C`, `[Fe+2]` -> `C`.  Hydrogen atoms
+    and the wildcard `*`, as well as content which does not parse, are
+    kept as they are."""
+    if not token.endswith("]"):
+        return token
+    parts = _compiled(_BRACKET_CONTENT).fullmatch(token[1:-1])
+    if parts is None or parts[2] in ("H", "*"):
+        return token
+    return "C"
 
 
 def process_smiles(smiles: str) -> str:
-    """Sequential reduction of a compound described by a SMILES string."""
-    only_single_bonds = saturate_bonds(smiles)
-    on_carbon = saturate_carbon(only_single_bonds)
-    on_nitrogen = saturate_nitrogen(on_carbon)
-    on_oxygen = saturate_oxygen(on_nitrogen)
-    on_phosphorus = saturate_phosphorus(on_oxygen)
-    on_sulfur = saturate_sulfur(on_phosphorus)
-    result = on_sulfur
+    """Reduce a compound described by a SMILES string in a single pass.
 
-    return result
+    The SMILES string is split once into bracket atoms and the segments
+    between them.  Outside of square brackets, the saturation is a plain
+    character translation (remove `=`, `#`, `/`, `\\`, capitalize c, n,
+    o, p, s), inside of square brackets function `saturate_bracket_atom`
+    applies.  The result is the same as the one of the sequential chain
+    in `process_smiles_sequential`."""
+    if "[" not in smiles:
+        return smiles.translate(_SATURATION_TABLE)
 
+    tokens = _compiled(_BRACKET_ATOM).split(smiles)
+    tokens[0::2] = [segment.translate(_SATURATION_TABLE) for segment in tokens[0::2]]
+    tokens[1::2] = [saturate_bracket_atom(atom) for atom in tokens[1::2]]
+    return "".join(tokens)
 
-def process_input_files(input_files: list[str]) -> None:
-    """Sequentially process input files with lists of SMILES strings."""
-    for file in input_files:
+
+def saturate_list(smiles_strings: list[str]) -> list[str]:
+    """Saturate a list of SMILES strings at once.
+
+    The SMILES strings are joined by line feeds (a character not used in
+    SMILES) into one buffer, which is saturated by one call of function
+    `process_smiles` and split again.  If an entry contains a line feed
+    itself, the entries are saturated one by one."""
+    results = process_smiles("\n".join(smiles_strings)).split("\n")
+    if len(results) != len(smiles_strings):
+        return [process_smiles(smiles) for smiles in smiles_strings]
+    return results
+
+
+def saturate_many(
+    smiles_strings: Iterable[str], batch_size: int = BATCH_SIZE
+) -> Iterator[str]:
+    """Saturate the SMILES strings of an iterable, batch by batch.
+
+    The results are yielded in the sequence of input; only one batch of
+    `batch_size` entries is held in memory at a time."""
+    iterator = iter(smiles_strings)
+    while batch := list(itertools.islice(iterator, batch_size)):
+        yield from saturate_list(batch)
+
+
+def process_smiles_levels(
+    smiles: str, levels: Sequence[str] = LEVELS
+) -> tuple[str, ...]:
+    """Reduce a SMILES string to several levels at once.
+
+    The levels (confer `LEVELS`) are reported in the sequence requested:
+    + `scaffold`, the SMILES string as given (e.g., a Murcko scaffold of
+      DataWarrior);
+    + `saturated`, the result of function `process_smiles`;
+    + `skeleton`, the generic Bemis-Murcko skeleton: each heavy atom is
+      a carbon atom, each bond a single one, charges and stereo markers
+      are dropped (confer function `skeleton_bracket_atom`).
+    The SMILES string is split into bracket atoms and segments once for
+    all levels."""
+    tokens = _compiled(_BRACKET_ATOM).split(smiles) if "[" in smiles else [smiles]
+    results = []
+    for level in levels:
+        if level == "scaffold":
+            results.append(smiles)
+            continue
+        if level == "saturated":
+            table, bracket_atom = _SATURATION_TABLE, saturate_bracket_atom
+        elif level == "skeleton":
+            table, bracket_atom = _SKELETON_TABLE, skeleton_bracket_atom
+        else:
+            raise ValueError(f"unknown level {level!r}, choose from {LEVELS}")
+        reduced = tokens.copy()
+        reduced[0::2] = [segment.translate(table) for segment in tokens[0::2]]
+        reduced[1::2] = [bracket_atom(atom) for atom in tokens[1::2]]
+        results.append("".join(reduced))
+    return tuple(results)
+
+
+def saturate_levels(
+    smiles_strings: list[str], levels: Sequence[str] = LEVELS
+) -> list[tuple[str, ...]]:
+    """Reduce a list of SMILES strings to several levels at once.
+
+    As by function `saturate_list`, the SMILES strings are joined by line
+    feeds into one buffer, processed by one call of the function
+    `process_smiles_levels`, and split again; each entry yields a tuple
+    of its levels."""
+    columns = process_smiles_levels("\n".join(smiles_strings), levels)
+    rows = list(zip(*(column.split("\n") for column in columns)))
+    if len(rows) != len(smiles_strings):
+        return [process_smiles_levels(smiles, levels) for smiles in smiles_strings]
+    return rows
+
+
+def _level_lines(levels: Sequence[str], lines: list[str]) -> list[str]:
+    """Reduce a batch of lines to levels, reported as tab-separated rows."""
+    rows = saturate_levels([line.strip() for line in lines], levels)
+    return ["\t".join(row) for row in rows]
+
+
+def _transform_bracket(token: str, stages: frozenset[str]) -> str:
+    """Apply the selected stages to one atom in square brackets at once.
+
+    The content is parsed once; the stages drop its parts (isotope,
+    chirality, hydrogen count, charge), or (`saturate`) capitalize an
+    aromatic symbol of table `AROMATIC_ELEMENTS`.  If this leaves a bare
+    symbol of the organic subset, the brackets are dropped as well, e.g.
+    `[13CH]` -> `C`, `[nH+]` -> `N`.  Content which does not parse is kept,
+    and so are atoms left as they were, e.g. `[C]`."""
+    closed = token.endswith("]") and len(token) > 1
+    content = token[1:-1] if closed else token[1:]
+    if "saturate" in stages:
+        content = content.translate(_BOND_DELETION)
+
+    parts = _compiled(_BRACKET_CONTENT).fullmatch(content)
+    if parts is not None:
+        isotope, symbol, chirality, hydrogens, charge, label = parts.groups("")
+        if "saturate" in stages and symbol in AROMATIC_ELEMENTS:
+            symbol = symbol.capitalize()
+        reduced = "".join(
+            [
+                "" if "isotopes" in stages else isotope,
+                symbol,
+                "" if "stereo" in stages else chirality,
+                "" if "hydrogens" in stages else hydrogens,
+                "" if "charges" in stages else charge,
+                label,
+            ]
+        )
+        if closed and reduced != content and reduced in _BARE_SYMBOLS:
+            return reduced
+        content = reduced
+    return f"[{content}]" if closed else f"[{content}"
+
+
+# Symbols written without square brackets, in the aliphatic and aromatic form.
+_BARE_SYMBOLS = frozenset(ORGANIC_SUBSET).union(AROMATIC_SYMBOLS)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_stages(stages: tuple[str, ...] = ("saturate",)) -> Callable[[str], str]:
+    """Fuse a selection of `STAGES` into one function about a SMILES string.
+
+    Rather than one rewrite of the SMILES string per stage, the function
+    splits it once into bracket atoms and the segments between them.
+    The segments pass one translation by a table joining the ones of the
+    stages (`saturate`, as by `process_smiles`; `stereo` deletes `/` and
+    `\\`); each bracket atom passes function `_transform_bracket` once,
+    cached.  The stages commute; their sequence does not matter.  With
+    `("saturate",)`, the result is the one of `process_smiles`.  The
+    function is compiled once per selection."""
+    unknown = set(stages).difference(STAGES)
+    if unknown:
+        raise ValueError(f"unknown stages {sorted(unknown)}, choose from {STAGES}")
+    selected = frozenset(stages)
+    mapping: dict[int, int | None] = {}
+    if "saturate" in selected:
+        mapping.update(_SATURATION_TABLE)
+    if "stereo" in selected:
+        mapping.update(str.maketrans("", "", "/\\"))
+    table = str.maketrans(mapping)
+
+    @functools.lru_cache(maxsize=4096)
+    def bracket_atom(token: str) -> str:
+        return _transform_bracket(token, selected)
+
+    def transform(smiles: str) -> str:
+        if "[" not in smiles:
+            return smiles.translate(table)
+        tokens = _compiled(_BRACKET_ATOM).split(smiles)
+        tokens[0::2] = [segment.translate(table) for segment in tokens[0::2]]
+        tokens[1::2] = [bracket_atom(atom) for atom in tokens[1::2]]
+        return "".join(tokens)
+
+    return transform
+
+
+def transform_list(smiles_strings: list[str], stages: tuple[str, ...]) -> list[str]:
+    """Apply a selection of `STAGES` to a list of SMILES strings at once.
+
+    As by function `saturate_list`, the SMILES strings are joined by line
+    feeds into one buffer, processed by one call of the function compiled
+    by `compile_stages`, and split again."""
+    transform = compile_stages(stages)
+    results = transform("\n".join(smiles_strings)).split("\n")
+    if len(results) != len(smiles_strings):
+        return [transform(smiles) for smiles in smiles_strings]
+    return results
+
+
+def _stage_lines(stages: tuple[str, ...], lines: list[str]) -> list[str]:
+    """Apply a selection of stages to a batch of lines."""
+    return transform_list([line.strip() for line in lines], stages)
+
+
+@functools.lru_cache(maxsize=4096)
+def _renumbered(labels: tuple[str, ...]) -> tuple[str, ...]:
+    """Renumber a sequence of ring closure labels in order of appearance.
+
+    A ring opened takes the lowest number not open at this point, thus
+    numbers are reused once their ring is closed, as by most writers of
+    SMILES.  Numbers beyond 9 are written as `%10`, `%11`, ..."""
+    opened: dict[str, int] = {}
+    renumbered = []
+    for label in labels:
+        if label in opened:
+            number = opened.pop(label)
+        else:
+            in_use = set(opened.values())
+            number = next(n for n in itertools.count(1) if n not in in_use)
+            opened[label] = number
+        renumbered.append(str(number) if number < 10 else f"%{number}")
+    return tuple(renumbered)
+
+
+def renumber_rings(smiles: str) -> str:
+    """Renumber the ring closures of a SMILES string in order of appearance.
+
+    E.g., `C2CCCCC2` -> `C1CCCCC1`, `C1CC2CC1CC2` -> `C1CC2CC1CC2`, and
+    `C3CC2.C2CC3` -> `C1CC2.C2CC1`; digits in square brackets (isotopes,
+    charges, hydrogens) are kept.  Nothing else changes, thus this is a
+    cheap normalization, not a canonical SMILES.  A SMILES string whose
+    labels already are in order is returned as it is."""
+    outside = smiles
+    if "[" in smiles:
+        outside = _compiled(_BRACKET_ATOM).sub("", smiles)
+    if "%" in outside:
+        labels = tuple(_compiled(r"%\d\d|\d").findall(outside))
+    else:
+        labels = tuple(outside.translate(_DIGITS_ONLY))
+    renumbered = _renumbered(labels)
+    if renumbered == labels:
+        return smiles
+
+    tokens = _compiled(_RING_LABEL).split(smiles)
+    if "[" not in smiles:
+        tokens[1::2] = renumbered
+    else:
+        positions = [
+            position
+            for position in range(1, len(tokens), 2)
+            if not tokens[position].startswith("[")
+        ]
+        for position, label in zip(positions, renumbered):
+            tokens[position] = label
+    return "".join(tokens)
+
+
+def scaffold_hash(smiles: str) -> int:
+    """Hash a (saturated, renumbered) SMILES string to a 64-bit integer.
+
+    The hash is BLAKE2b of `HASH_BYTES` bytes, i.e. the same across runs,
+    platforms, and versions of Python, as a key to shard or join large
+    listings by."""
+    import hashlib
+
+    digest = hashlib.blake2b(smiles.encode(), digest_size=HASH_BYTES).digest()
+    return int.from_bytes(digest, "big")
+
+
+def finish_lines(results: list[str], renumber: bool, hashed: bool) -> list[str]:
+    """Renumber the ring closures of results, and append their hash.
+
+    The hash (function `scaffold_hash`) is appended after a tabulator, as
+    hexadecimal number of fixed width (16 digits).  Empty results stay
+    empty."""
+    if renumber:
+        results = [renumber_rings(result) for result in results]
+    if hashed:
+        results = [
+            result and f"{result}\t{scaffold_hash(result):0{2 * HASH_BYTES}x}"
+            for result in results
+        ]
+    return results
+
+
+class ResultShape:
+    """The form of the results, besides the saturation itself.
+
+    It holds the options of the CLI about the results, passed on as one:
+    `levels` (confer function `process_smiles_levels`), `stages` (confer
+    function `compile_stages`), and `renumber` and `hashed` (confer
+    function `finish_lines`).  By default, each line yields its saturated
+    SMILES string.  Being picklable, it is passed to pools of processes
+    as well."""
+
+    def __init__(
+        self,
+        levels: Sequence[str] | None = None,
+        stages: Sequence[str] | None = None,
+        renumber: bool = False,
+        hashed: bool = False,
+    ) -> None:
+        self.levels = tuple(levels) if levels else None
+        self.stages = tuple(stages) if stages else None
+        self.renumber = renumber
+        self.hashed = hashed
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "ResultShape":
+        """Collect the shape set by the command-line arguments."""
+        return cls(args.levels, args.stages, args.renumber, args.hash)
+
+    @property
+    def finished(self) -> bool:
+        """Whether the results are finished by function `finish_lines`."""
+        return self.renumber or self.hashed
+
+    def lines_function(self, check: bool = False) -> Callable[[list[str]], list[str]]:
+        """Provide the function about a batch of lines, yet unfinished.
+
+        With `check`, lines which are not SMILES strings yield empty
+        results; confer function `saturate_valid_lines`."""
+        if self.levels is not None:
+            return functools.partial(_level_lines, self.levels)
+        if self.stages is not None:
+            return functools.partial(_stage_lines, self.stages)
+        return saturate_valid_lines if check else saturate_lines
+
+    def finish(self, results: list[str]) -> list[str]:
+        """Renumber the ring closures of results, and append their hash."""
+        if not self.finished:
+            return results
+        return finish_lines(results, self.renumber, self.hashed)
+
+
+def _finish(
+    function: Callable[[list[str]], list[str]],
+    shape: ResultShape,
+    lines: list[str],
+) -> list[str]:
+    """Saturate a batch of lines by a function, and finish the results."""
+    return shape.finish(function(lines))
+
+
+def _saturate_bracket_bytes(token: bytes) -> bytes:
+    """Saturate one atom in square brackets, held as bytes."""
+    return saturate_bracket_atom(token.decode("latin-1")).encode("latin-1")
+
+
+def process_smiles_bytes(smiles: bytes | bytearray | memoryview) -> bytes:
+    """Saturate a SMILES string held as bytes, without decoding it.
+
+    Besides `bytes`, a `bytearray` or `memoryview` (e.g., of a memory
+    map) is accepted; the result is `bytes`.  Outside of square brackets,
+    one translation by precomputed tables deletes the bonds and maps the
+    aromatic symbols to upper case; only atoms in square brackets are
+    parsed one by one (confer function `saturate_bracket_atom`).  For
+    ASCII, the result equals the one of `process_smiles`."""
+    data = smiles if isinstance(smiles, bytes) else bytes(smiles)
+    if b"[" not in data:
+        return data.translate(_BYTE_SATURATION_TABLE, _BOND_BYTES)
+
+    tokens = _compiled_bytes(_BRACKET_ATOM_BYTES).split(data)
+    tokens[0::2] = [
+        segment.translate(_BYTE_SATURATION_TABLE, _BOND_BYTES)
+        for segment in tokens[0::2]
+    ]
+    tokens[1::2] = [_saturate_bracket_bytes(atom) for atom in tokens[1::2]]
+    return b"".join(tokens)
+
+
+def saturate_block(block: bytes | bytearray | memoryview) -> bytes:
+    """Saturate a block of lines held as bytes, one SMILES per line.
+
+    The result equals the one of `process_smiles` about each line (with
+    leading and trailing blanks removed) for ASCII listings, without
+    decoding the block into text.  Each line of the result, including
+    the last one, ends with a line feed.  Since a bracket atom does not
+    span lines, function `process_smiles_bytes` saturates the whole
+    block at once."""
+    if not isinstance(block, bytes):
+        block = bytes(block)
+    if _compiled_bytes(_SPACING_BYTES).search(block):
+        block = b"\n".join(line.strip() for line in block.split(b"\n"))
+    if block and not block.endswith(b"\n"):
+        block += b"\n"
+    return process_smiles_bytes(block)
+
+
+@functools.lru_cache(maxsize=4096)
+def _signature_error(signature: str) -> str | None:
+    """Check the branches and ring closures left of a SMILES string."""
+    depth = 0
+    open_rings: set[str] = set()
+    position = 0
+    while position < len(signature):
+        char = signature[position]
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth < 0:
+                return "unbalanced parentheses"
+        elif char == "%":
+            label = signature[position : position + 3]
+            if len(label) < 3 or not (label[1:].isascii() and label[1:].isdigit()):
+                return "invalid ring closure"
+            open_rings ^= {label}
+            position += 2
+        elif char.isascii() and char.isdigit():
+            open_rings ^= {char}
+        elif char == "]":
+            return "unbalanced square brackets"
+        else:
+            return f"invalid character {char!r}"
+        position += 1
+    if depth:
+        return "unbalanced parentheses"
+    if open_rings:
+        return f"unpaired ring closure {min(open_rings)}"
+    return None
+
+
+def _tokens_error(atoms: list[str], segments: str) -> str | None:
+    """Check a SMILES string split into bracket atoms and the segments
+    between them (joined by NUL characters); or several SMILES strings,
+    separated by line feeds.
+
+    Each distinct signature (confer `_SIGNATURE_DELETION`) of the lines is
+    checked once."""
+    joined = "".join(atoms)
+    if joined.count("]") < len(atoms):
+        return "unbalanced square brackets"
+    if "[]" in joined:
+        return "empty square brackets"
+    if _compiled(_MISPLACED_BOND).search(segments):
+        return "misplaced bond symbol"
+    skeleton = segments.translate(_SIGNATURE_DELETION)
+    for signature in set(skeleton.split("\n")):
+        if reason := _signature_error(signature):
+            return reason
+    return None
+
+
+def validate_smiles(smiles: str) -> str | None:
+    """Report why a string is not a SMILES string, or `None` if it is one.
+
+    The check is about the syntax: the characters outside of square
+    brackets, the place of bond symbols, the balance of square brackets
+    and parentheses, and the pairing of ring closures (`1`, or `%12`).
+    The content of square brackets is not inspected."""
+    if not smiles:
+        return "empty line"
+    if "\0" in smiles:
+        return "invalid character '\\x00'"
+    tokens = _compiled(_BRACKET_ATOM).split(smiles)
+    return _tokens_error(tokens[1::2], "\0".join(tokens[0::2]))
+
+
+def saturate_valid_lines(lines: list[str]) -> list[str]:
+    """Saturate a batch of lines, each about one SMILES string, if valid.
+
+    As function `saturate_lines`, but a line which is not a SMILES string
+    (confer function `validate_smiles`) yields an empty string.  The check
+    shares the tokenizing with the saturation: the block of lines is
+    split once into bracket atoms and the segments between them, and the
+    segments, joined by NUL characters, are both checked and saturated by
+    one translation each.  Only a block failing the check is processed
+    line by line."""
+    block = "".join(lines)
+    if "\n" not in block:
+        block = "\n".join(lines)
+    if not block.endswith("\n"):
+        block += "\n"
+    if (
+        block.count("\n") == len(lines)
+        and not block.startswith("\n")
+        and "\n\n" not in block
+        and "\0" not in block
+    ):
+        tokens = _compiled(_BRACKET_ATOM).split(block)
+        segments = "\0".join(tokens[0::2])
+        if _tokens_error(tokens[1::2], segments) is None:
+            tokens[0::2] = segments.translate(_SATURATION_TABLE).split("\0")
+            tokens[1::2] = [saturate_bracket_atom(atom) for atom in tokens[1::2]]
+            results = "".join(tokens).split("\n")
+            results.pop()
+            return results
+
+    results = []
+    for line in lines:
+        smiles = line.strip()
+        results.append("" if validate_smiles(smiles) else process_smiles(smiles))
+    return results
+
+
+def drop_names(lines: list[str]) -> list[str]:
+    """Reduce lines to their first field, e.g. a SMILES string with a name."""
+    block = "".join(lines)
+    if " " not in block and "\t" not in block:
+        return lines
+    return [fields[0] if (fields := line.split(None, 1)) else "" for line in lines]
+
+
+def drop_comments(lines: list[str]) -> list[str]:
+    """Blank the comments (lines starting with `#`) of a block of lines.
+
+    A comment may be a SMILES string commented out; blanked, it is not
+    checked (nor saturated), but skipped as any blank line."""
+    if "#" not in "".join(lines):
+        return lines
+    return ["" if line.lstrip().startswith("#") else line for line in lines]
+
+
+def drop_rejected(
+    results: list[str],
+    lines: list[str],
+    name: str,
+    first: int = 0,
+    lenient: bool = False,
+    errors: TextIO | None = None,
+) -> list[str]:
+    """Drop the results of rejected lines, and report these lines.
+
+    A line is rejected if its result by function `saturate_valid_lines`
+    is empty; it is reported to `errors` (by default, stderr) as
+    `name:number: reason: line`, numbered from `first + 1` on.  In
+    lenient mode, blank lines and comments (`#`) are dropped silently."""
+    if "" not in results:
+        return results
+    kept = []
+    for number, (line, result) in enumerate(zip(lines, results), first + 1):
+        if result:
+            kept.append(result)
+            continue
+        smiles = line.strip()
+        if lenient:
+            if not smiles or smiles.startswith("#"):
+                continue
+            smiles = smiles.split(None, 1)[0]
+        reason = validate_smiles(smiles)
+        (errors or sys.stderr).write(f"{name}:{number}: {reason}: {line.rstrip()}\n")
+    return kept
+
+
+class StageProfile:
+    """Statistics about the stages of processing listings.
+
+    A stage (e.g., `read`, `saturate`, `write`) is recorded once per block
+    of lines with the time used, the characters (thus, bytes of SMILES)
+    in and out, and the lines out.  Without a profile in use, the cost
+    is one check per block of lines."""
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.stages: dict[str, dict[str, float]] = {}
+
+    def record(
+        self, stage: str, start: float, before: list[str], after: list[str]
+    ) -> None:
+        """Add one block to a stage which started at time `start`."""
+        elapsed = time.perf_counter() - start
+        entry = self.stages.setdefault(
+            stage,
+            {"calls": 0, "seconds": 0.0, "chars_in": 0, "chars_out": 0, "lines": 0},
+        )
+        entry["calls"] += 1
+        entry["seconds"] += elapsed
+        entry["chars_in"] += sum(map(len, before))
+        entry["chars_out"] += sum(map(len, after))
+        entry["lines"] += len(after)
+
+    def record_block(
+        self, stage: str, start: float, before: bytes, after: bytes
+    ) -> None:
+        """Add one block of lines held as bytes to a stage."""
+        elapsed = time.perf_counter() - start
+        entry = self.stages.setdefault(
+            stage,
+            {"calls": 0, "seconds": 0.0, "chars_in": 0, "chars_out": 0, "lines": 0},
+        )
+        entry["calls"] += 1
+        entry["seconds"] += elapsed
+        entry["chars_in"] += len(before)
+        entry["chars_out"] += len(after)
+        entry["lines"] += after.count(b"\n")
+
+    def as_dict(self) -> dict:
+        """Report the statistics, and the time elapsed in total."""
+        return {
+            "seconds_total": time.perf_counter() - self.start,
+            "stages": self.stages,
+        }
+
+    def report(self) -> str:
+        """Summarize the statistics as a table."""
+        total = time.perf_counter() - self.start
+        rows = [
+            f"{'stage':10s} {'calls':>8s} {'seconds':>9s} {'share':>7s}"
+            f" {'MB in':>8s} {'MB out':>8s} {'lines':>10s}"
+        ]
+        for stage, entry in self.stages.items():
+            rows.append(
+                f"{stage:10s} {entry['calls']:8.0f} {entry['seconds']:9.3f}"
+                f" {entry['seconds'] / total:7.1%}"
+                f" {entry['chars_in'] / 1e6:8.2f} {entry['chars_out'] / 1e6:8.2f}"
+                f" {entry['lines']:10.0f}"
+            )
+        rows.append(f"{'total':10s} {'':8s} {total:9.3f}")
+        return "\n".join(rows)
+
+
+# The profile in use; `None` (the default) disables the records.
+_PROFILE: StageProfile | None = None
+
+
+@contextlib.contextmanager
+def profiling() -> Iterator[StageProfile]:
+    """Record the stages of processing listings within a `with` block.
+
+    with profiling() as profile:
+        process_input_files(["example.smi"])
+    print(profile.report())"""
+    global _PROFILE
+    previous = _PROFILE
+    _PROFILE = StageProfile()
+    try:
+        yield _PROFILE
+    finally:
+        _PROFILE = previous
+
+
+class ScaffoldCache:
+    """Bounded cache of saturated SMILES strings.
+
+    Entries are keyed by the input SMILES string.  Once `maxsize` entries
+    are stored, the least recently used one is dropped for a new one.  An
+    instance can be called like `process_smiles`; attributes `hits` and
+    `misses` count the lookups to tune the size."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: collections.OrderedDict[str, str] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __call__(self, smiles: str) -> str:
+        result = self.get(smiles)
+        if result is None:
+            result = process_smiles(smiles)
+            self.put(smiles, result)
+        return result
+
+    def get(self, smiles: str) -> str | None:
+        """Report the cached result, or `None` if there is none."""
+        result = self._entries.get(smiles)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(smiles)
+        return result
+
+    def put(self, smiles: str, result: str) -> None:
+        """Store a result, possibly at the expense of the oldest entry."""
+        self._entries[smiles] = result
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get_many(self, keys: list[str]) -> dict[str, str]:
+        """Report the results cached about distinct SMILES strings."""
+        found = {}
+        for smiles in keys:
+            result = self.get(smiles)
+            if result is not None:
+                found[smiles] = result
+        return found
+
+    def put_many(self, results: dict[str, str]) -> None:
+        """Store a batch of results."""
+        for smiles, result in results.items():
+            self.put(smiles, result)
+
+    def report(self) -> str:
+        """Summarize the use of the cache."""
+        return (
+            f"cache: {self.hits} hits, {self.misses} misses, "
+            f"{len(self)} of {self.maxsize} entries used"
+        )
+
+    def close(self) -> None:
+        """Release the resources of the cache; nothing to do in memory."""
+
+
+def rules_fingerprint() -> str:
+    """Fingerprint the saturation rules and the engine applying them.
+
+    Besides `ENGINE_VERSION`, the tables of elements, and the patterns
+    and translation tables of the engine, its code enters the
+    fingerprint (bytecode, constants, and names, confer `_code_digest`);
+    thus an edit of the engine (or an other version of Python)
+    invalidates a persistent cache, too."""
+    import hashlib
+
+    digest = hashlib.sha256(
+        repr(
+            (
+                ENGINE_VERSION,
+                AROMATIC_ELEMENTS,
+                ORGANIC_SUBSET,
+                BOND_SYMBOLS,
+                _BRACKET_ATOM,
+                _BRACKET_CONTENT,
+                _SATURATION_TABLE,
+                _BOND_DELETION,
+                _BRACKET_ATOM_BYTES,
+                _BYTE_SATURATION_TABLE,
+                _BOND_BYTES,
+            )
+        ).encode()
+    )
+    for function in (
+        _saturate_bracket,
+        saturate_bracket_atom,
+        process_smiles,
+        _saturate_bracket_bytes,
+        process_smiles_bytes,
+        saturate_block,
+    ):
+        # unwrap the functions cached by `functools.lru_cache`
+        _code_digest(getattr(function, "__wrapped__", function).__code__, digest)
+    return digest.hexdigest()
+
+
+def _code_digest(code: CodeType, digest: Any) -> None:
+    """Add the bytecode, constants, and names of code to a digest.
+
+    Code nested as a constant (e.g., a comprehension) is added in turn,
+    rather than by its `repr` which includes an address in memory."""
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for constant in code.co_consts:
+        if isinstance(constant, type(code)):
+            _code_digest(constant, digest)
+        else:
+            digest.update(repr(constant).encode())
+
+
+class PersistentCache(ScaffoldCache):
+    """Cache of saturated SMILES strings in an SQLite database.
+
+    The entries persist across runs, keyed by the input SMILES string;
+    the database is emptied if the fingerprint of the saturation rules
+    differs from the one of the entries.  Lookups and insertions work in
+    batches (function `_lookup_batch` about a block of lines), one query
+    per up to 32766 distinct SMILES strings, one transaction per batch.
+    An optional cache of `maxsize` entries in memory is kept in front of
+    the database."""
+
+    def __init__(self, file: str, maxsize: int = 0) -> None:
+        import sqlite3
+
+        super().__init__(maxsize)
+        self.file = file
+        # host parameters per query; SQLite prior to 3.32 accepts up to 999
+        self._variables = 32766 if sqlite3.sqlite_version_info >= (3, 32) else 999
+        self._connection = sqlite3.connect(file)
+        self._connection.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS rules (fingerprint TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS scaffolds (
+                smiles TEXT PRIMARY KEY, result TEXT NOT NULL
+            ) WITHOUT ROWID;
+            """)
+        fingerprint = rules_fingerprint()
+        stored = self._connection.execute("SELECT fingerprint FROM rules").fetchall()
+        if stored != [(fingerprint,)]:
+            with self._connection:
+                self._connection.execute("DELETE FROM scaffolds")
+                self._connection.execute("DELETE FROM rules")
+                self._connection.execute("INSERT INTO rules VALUES (?)", (fingerprint,))
+
+    def __len__(self) -> int:
+        (count,) = self._connection.execute("SELECT count(*) FROM scaffolds").fetchone()
+        return count
+
+    def get(self, smiles: str) -> str | None:
+        """Report the cached result, or `None` if there is none."""
+        return self.get_many([smiles]).get(smiles)
+
+    def put(self, smiles: str, result: str) -> None:
+        """Store a result."""
+        self.put_many({smiles: result})
+
+    def get_many(self, keys: list[str]) -> dict[str, str]:
+        """Report the results cached about distinct SMILES strings."""
+        found = {}
+        absent = []
+        for smiles in keys:
+            result = self._entries.get(smiles)
+            if result is None:
+                absent.append(smiles)
+            else:
+                self._entries.move_to_end(smiles)
+                found[smiles] = result
+        for offset in range(0, len(absent), self._variables):
+            chunk = absent[offset : offset + self._variables]
+            query = (
+                "SELECT smiles, result FROM scaffolds "
+                f"WHERE smiles IN ({', '.join('?' * len(chunk))})"
+            )
+            stored = dict(self._connection.execute(query, chunk))
+            self._remember(stored)
+            found.update(stored)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, results: dict[str, str]) -> None:
+        """Store a batch of results, in one transaction."""
+        self._remember(results)
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO scaffolds VALUES (?, ?)", results.items()
+            )
+
+    def _remember(self, results: dict[str, str]) -> None:
+        """Keep results in the cache in memory in front of the database."""
+        if self.maxsize > 0:
+            for smiles, result in results.items():
+                ScaffoldCache.put(self, smiles, result)
+
+    def report(self) -> str:
+        """Summarize the use of the cache."""
+        return (
+            f"cache: {self.hits} hits, {self.misses} misses, "
+            f"{len(self)} entries in {self.file}"
+        )
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+
+class ScaffoldTally:
+    """Count the distinct saturated SMILES strings of a listing.
+
+    Results are added block by block, per input: the SMILES strings of
+    the CLI (position -1), or an input file (tagged by its position among
+    the input files, from 0 on).  Lines are numbered from 1 on per input,
+    and the first line yielding a SMILES string is reported with the
+    name of its input.  Once more than `max_entries`
+    distinct SMILES strings are held in memory, these are moved as a
+    sorted run into a temporary file.  The report merges these runs,
+    and it is sorted by the saturated SMILES strings."""
+
+    def __init__(
+        self,
+        counts: bool = False,
+        first_line: bool = False,
+        max_entries: int = MAX_UNIQUE,
+    ) -> None:
+        self.counts = counts
+        self.first_line = first_line
+        self.max_entries = max_entries
+        self.lines = 0
+        self._position: int | None = None
+        self._names: dict[int, str] = {}
+        self._counter: collections.Counter[str] = collections.Counter()
+        self._first: dict[str, tuple[int, int]] = {}
+        self._runs: list[TextIO] = []
+
+    def empty_copy(self) -> "ScaffoldTally":
+        """Provide a new, empty tally with the same settings."""
+        return ScaffoldTally(self.counts, self.first_line, self.max_entries)
+
+    def add(
+        self, results: list[str], name: str = "argument", position: int = -1
+    ) -> None:
+        """Count a block of saturated SMILES strings of an input.
+
+        Blocks of the same position continue the numbering of its lines."""
+        start = time.perf_counter()
+        if position != self._position:
+            self._position = position
+            self._names[position] = name
+            self.lines = 0
+        self._counter.update(results)
+        if self.first_line:
+            for number, smiles in enumerate(results, start=self.lines + 1):
+                self._first.setdefault(smiles, (position, number))
+        self.lines += len(results)
+        if len(self._counter) > self.max_entries:
+            self._spill()
+        if _PROFILE is not None:
+            _PROFILE.record("tally", start, results, results)
+
+    def _in_memory(self) -> Iterator[tuple[str, int, tuple[int, int]]]:
+        for smiles in sorted(self._counter):
+            yield smiles, self._counter[smiles], self._first.get(smiles, (0, 0))
+
+    def _spill(self) -> None:
+        """Move the entries held in memory as a sorted run to disk."""
+        import tempfile
+
+        run = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+        for smiles, count, (position, number) in self._in_memory():
+            run.write(f"{smiles}\t{count}\t{position}\t{number}\n")
+        run.seek(0)
+        self._runs.append(run)
+        self._counter.clear()
+        self._first.clear()
+
+    @staticmethod
+    def _read_run(run: TextIO) -> Iterator[tuple[str, int, tuple[int, int]]]:
+        for line in run:
+            # a result may hold tabulators itself, e.g. a name, or a hash
+            smiles, count, position, number = line.rstrip("\n").rsplit("\t", 3)
+            yield smiles, int(count), (int(position), int(number))
+
+    def entries(self) -> Iterator[tuple[str, int, tuple[int, int]]]:
+        """Report the distinct SMILES with their count and first line.
+
+        The first line is the position of the input, and the number of
+        the line in it (confer method `name`)."""
+        import heapq
+
+        runs = [self._read_run(run) for run in self._runs]
+        merged = heapq.merge(*runs, self._in_memory())
+        for smiles, group in itertools.groupby(merged, key=lambda entry: entry[0]):
+            entries = list(group)
+            count = sum(entry[1] for entry in entries)
+            first = min(entry[2] for entry in entries)
+            yield smiles, count, first
+
+    def name(self, position: int) -> str:
+        """Name the input of a position, e.g. an input file."""
+        return self._names[position]
+
+    def write(self, sink: TextIO) -> None:
+        """Write the report, one distinct saturated SMILES per line.
+
+        The first line yielding it is reported as two columns, the name
+        of the input, and the number of the line."""
+        listing = []
+        for smiles, count, (position, number) in self.entries():
+            columns = [smiles]
+            if self.counts:
+                columns.append(str(count))
+            if self.first_line:
+                columns += [self._names[position], str(number)]
+            listing.append("\t".join(columns))
+            if len(listing) >= 10_000:
+                write_record(sink, listing)
+                listing = []
+        write_record(sink, listing)
+        for run in self._runs:
+            run.close()
+        self._runs = []
+
+
+class ScaffoldIndex:
+    """Index of input files by their saturated SMILES, in SQLite.
+
+    Results are added block by block, per input file, as they are
+    written; lines are numbered from 1 on per input file (tagged by its
+    position among the inputs, thus a file given twice is indexed
+    twice, as two files of the same name), and empty results
+    (e.g., blank lines) are not indexed.  The rows are appended to a
+    temporary table as they come, and sorted into the B-tree of the
+    index once it is closed; thus the build streams, and SQLite sorts
+    in temporary files beyond memory.  The database is built next to
+    `file`, and replaces it when closed; confer function
+    `lookup_scaffolds` about the queries, which are saturated by the
+    stages and renumbering of the `shape` recorded."""
+
+    def __init__(
+        self,
+        file: str,
+        shape: ResultShape | None = None,
+    ) -> None:
+        import sqlite3
+
+        self.file = file
+        self.lines = 0
+        self.entries = 0
+        self._building = file + ".tmp"
+        self._position: int | None = None
+        self._file_id: int | None = None
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self._building)
+        self._connection = sqlite3.connect(self._building)
+        self._connection.executescript("""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE files (id INTEGER PRIMARY KEY, name TEXT NOT NULL);
+            CREATE TABLE entries (
+                scaffold TEXT NOT NULL,
+                file INTEGER NOT NULL,
+                line INTEGER NOT NULL,
+                PRIMARY KEY (scaffold, file, line)
+            ) WITHOUT ROWID;
+            CREATE TEMP TABLE arrivals (
+                scaffold TEXT NOT NULL, file INTEGER NOT NULL, line INTEGER NOT NULL
+            );
+            """)
+        settings = {
+            "rules": rules_fingerprint(),
+            "stages": ",".join(shape.stages or ()) if shape else "",
+            "renumber": str(int(shape is not None and shape.renumber)),
+        }
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO settings VALUES (?, ?)", settings.items()
+            )
+
+    def add(self, position: int, file: str, results: list[str]) -> None:
+        """Index a block of saturated SMILES strings of an input file.
+
+        The file is tagged by its position among the inputs; blocks of
+        the same position continue the numbering of its lines."""
+        if position != self._position:
+            self._position = position
+            self.lines = 0
+            cursor = self._connection.execute(
+                "INSERT INTO files (name) VALUES (?)", (file,)
+            )
+            self._file_id = cursor.lastrowid
+        rows = [
+            (result, self._file_id, number)
+            for number, result in enumerate(results, self.lines + 1)
+            if result
+        ]
+        self.lines += len(results)
+        self.entries += len(rows)
+        with self._connection:
+            self._connection.executemany("INSERT INTO arrivals VALUES (?, ?, ?)", rows)
+
+    def report(self) -> str:
+        """Summarize the index."""
+        return f"index: {self.entries} entries in {self.file}"
+
+    def close(self) -> None:
+        """Sort the index, and replace the earlier one of this path."""
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO entries SELECT * FROM arrivals ORDER BY scaffold, file, line"
+            )
+        self._connection.close()
+        os.replace(self._building, self.file)
+
+    def discard(self) -> None:
+        """Drop an incomplete index; the earlier one stays in place."""
+        self._connection.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self._building)
+
+
+def lookup_scaffolds(
+    file: str, smiles_strings: Iterable[str]
+) -> Iterator[tuple[str, str, int]]:
+    """Look up SMILES strings in an index built by class `ScaffoldIndex`.
+
+    Each SMILES string is saturated (and renumbered) as the index was
+    built, thus either a compound or its saturated scaffold may be
+    given.  Reported are the SMILES string as given, the name of the
+    input file, and the number of the line yielding the same result, in
+    the sequence of the queries, then files, then lines; each query is
+    one search of the B-tree.  A change of the saturation rules since
+    the build is reported to stderr."""
+    import pathlib
+    import sqlite3
+
+    uri = pathlib.Path(file).absolute().as_uri() + "?mode=ro"
+    connection = sqlite3.connect(uri, uri=True)
+    try:
+        settings = dict(connection.execute("SELECT key, value FROM settings"))
+        files = dict(connection.execute("SELECT id, name FROM files"))
+        if settings["rules"] != rules_fingerprint():
+            print(f"index {file} was built by other saturation rules", file=sys.stderr)
+        stages = tuple(settings["stages"].split(",")) if settings["stages"] else None
+        saturate = compile_stages(stages) if stages else process_smiles
+        renumber = settings["renumber"] == "1"
+        query = "SELECT file, line FROM entries WHERE scaffold = ? ORDER BY file, line"
+        for smiles in smiles_strings:
+            result = saturate(smiles)
+            if renumber:
+                result = renumber_rings(result)
+            for file_id, line in connection.execute(query, (result,)):
+                yield smiles, files[file_id], line
+    finally:
+        connection.close()
+
+
+def read_queries(inputs: list[str]) -> Iterator[str]:
+    """Provide the SMILES strings given, and the ones of input files.
+
+    Of a line of an input file, the first field is the SMILES string;
+    blank lines are skipped.  A file not accessible is reported."""
+    for argument in inputs:
+        if not is_input_file(argument):
+            yield argument
+            continue
+        try:
+            with open_file(
+                argument, "r", compression_of(argument), encoding="utf-8"
+            ) as source:
+                for lines in read_batches(source):
+                    for line in lines:
+                        if fields := line.split(None, 1):
+                            yield fields[0]
+        except _decompression_errors():
+            print(f"file {argument} is not accessible")
+
+
+def plain_file_name(file: str) -> str:
+    """Drop the extension of compression (e.g., `.gz`) off a file name."""
+    stem, extension = os.path.splitext(file)
+    return stem if extension.lower() in COMPRESSION_EXTENSIONS else file
+
+
+def output_file_name(
+    input_file: str, extension: str = ".smi", compression: str | None = None
+) -> str:
+    """Name the permanent record about an input file."""
+    stem_input_file = os.path.splitext(plain_file_name(input_file))[0]
+    suffix = ""
+    if compression is not None:
+        suffix = {v: k for k, v in COMPRESSION_EXTENSIONS.items()}[compression]
+    return "".join([stem_input_file, "_sat", extension, suffix])
+
+
+def is_input_file(argument: str) -> bool:
+    """Tell an input file (or stdin, by `STDIN`) from a SMILES string."""
+    return argument == STDIN or os.path.isfile(argument)
+
+
+def compression_of(file: str) -> str | None:
+    """Identify the compression of a file by extension, or by magic bytes.
+
+    Stdin is read as it is; decompress it upstream in the pipeline."""
+    if file == STDIN:
+        return None
+    extension = os.path.splitext(file)[1].lower()
+    if extension in COMPRESSION_EXTENSIONS:
+        return COMPRESSION_EXTENSIONS[extension]
+    with open(file, mode="rb") as source:
+        head = source.read(6)
+    for magic, compression in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _zstd_module() -> Any:
+    """Provide zstd of the standard library (Python 3.14+), or zstandard."""
+    import importlib
+
+    for name in ("compression.zstd", "zstandard"):
+        try:
+            return importlib.import_module(name)
+        except ImportError:
+            continue
+    return None
+
+
+def open_file(
+    file: str, mode: str = "r", compression: str | None = None, **kwargs
+) -> Any:
+    """Open a file, compressed by gzip, bz2, xz, or zstd if set.
+
+    The keywords (e.g., `encoding`) apply as for `open`, except for
+    `buffering` which only applies to files without compression.  The
+    file `STDIN` is stdin, read in blocks of `READ_BLOCK_SIZE` bytes;
+    closing it leaves stdin open."""
+    if file == STDIN and "r" in mode:
+        kwargs.pop("buffering", None)
+        source = open(
+            sys.stdin.fileno(), "rb", buffering=READ_BLOCK_SIZE, closefd=False
+        )
+        return source if "b" in mode else io.TextIOWrapper(source, **kwargs)
+    if compression is None:
+        return open(file, mode, **kwargs)
+    kwargs.pop("buffering", None)
+    if "b" not in mode and "t" not in mode:
+        mode += "t"
+    if compression == "gzip" and "r" not in mode:
+        # the level of gzip's CLI; the module's default 9 is much slower
+        kwargs.setdefault("compresslevel", 6)
+    if compression in COMPRESSORS:
+        import importlib
+
+        module = importlib.import_module(COMPRESSORS[compression])
+    else:
+        module = _zstd_module()
+    if module is None:
+        raise OSError(f"zstd needs Python 3.14, or package zstandard, about {file}")
+    return module.open(file, mode, **kwargs)
+
+
+def _decompression_errors() -> tuple[type[Exception], ...]:
+    """Name the errors about a damaged compressed file, besides OSError."""
+    import lzma
+
+    return (OSError, EOFError, lzma.LZMAError)
+
+
+def read_ahead(items: Iterator[T], depth: int = READ_AHEAD) -> Generator[T, None, None]:
+    """Iterate in a thread of its own, up to `depth` items ahead.
+
+    About a compressed file, decompression (which releases the GIL) thus
+    overlaps with the saturation of the preceding blocks.  An exception
+    of the iteration is raised again in the consumer's thread."""
+    import queue
+    import threading
+
+    pipe: queue.Queue[tuple[bool, Any]] = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(entry: tuple[bool, Any]) -> bool:
+        while not stop.is_set():
+            try:
+                pipe.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put((False, item)):
+                    return
+        except Exception as error:  # passed on to the consumer
+            put((True, error))
+        else:
+            put((True, None))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            finished, item = pipe.get()
+            if finished:
+                if item is not None:
+                    raise item
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def read_batches(
+    source: TextIO, block_size: int = READ_BLOCK_SIZE
+) -> Iterator[list[str]]:
+    """Read a listing of SMILES in blocks of complete lines."""
+    profile = _PROFILE
+    while True:
+        start = time.perf_counter()
+        lines = source.readlines(block_size)
+        if profile is not None:
+            profile.record("read", start, lines, lines)
+        if not lines:
+            return
+        yield lines
+
+
+def saturate_lines(lines: list[str]) -> list[str]:
+    """Saturate a batch of lines, each about one SMILES string."""
+    return saturate_list([line.strip() for line in lines])
+
+
+def write_record(sink: TextIO, listing: list[str]) -> None:
+    """Write a batch of results, one SMILES string per line."""
+    if listing:
+        start = time.perf_counter()
+        sink.write("\n".join(listing))
+        sink.write("\n")
+        if _PROFILE is not None:
+            _PROFILE.record("write", start, listing, listing)
+
+
+def saturate_stream(source: TextIO, sink: TextIO) -> None:
+    """Saturate a listing block by block, retaining the sequence of lines.
+
+    Only one block is held in memory at a time, regardless the size of
+    the listing."""
+    for lines in read_batches(source):
+        write_record(sink, saturate_lines(lines))
+
+
+def read_listings(
+    input_files: list[str], block_size: int = READ_BLOCK_SIZE
+) -> Iterator[tuple[int, list[str] | None]]:
+    """Read input files in blocks of lines, tagged by the file's index.
+
+    Each file contributes an empty block first (thus an empty file still
+    yields an empty record), and `None` if it is not accessible.  A
+    compressed file is decompressed by a thread reading ahead."""
+    for index, file in enumerate(input_files):
+        try:
+            compression = compression_of(file)
+            with open_file(file, "r", compression, encoding="utf-8") as source:
+                yield index, []
+                batches = read_batches(source, block_size)
+                if compression is None:
+                    for lines in batches:
+                        yield index, lines
+                    continue
+                with contextlib.closing(read_ahead(batches)) as ahead:
+                    for lines in ahead:
+                        yield index, lines
+        except _decompression_errors():
+            yield index, None
+
+
+def _lookup_batch(
+    cache: ScaffoldCache, lines: list[str], check: bool = False
+) -> tuple[list[str], list[str | None], list[str]]:
+    """Split a block into the SMILES, the cached results, and the misses.
+
+    The cache is queried once about the distinct SMILES of the block.  A
+    SMILES string missing in the cache is listed once as a miss, even if
+    it recurs in the block; the recurrences are counted as hits.  With
+    `check`, lines which are not SMILES strings are not queried (a cache
+    filled without the check may hold their results), but listed as
+    misses, thus rejected by `saturate_valid_lines`."""
+    keys = [line.strip() for line in lines]
+    distinct = list(dict.fromkeys(keys))
+    queried = distinct
+    if check:
+        queried = [smiles for smiles in distinct if validate_smiles(smiles) is None]
+        cache.misses += len(distinct) - len(queried)
+    found = cache.get_many(queried)
+    cache.hits += len(keys) - len(distinct)
+    cached = [found.get(smiles) for smiles in keys]
+    return keys, cached, [smiles for smiles in distinct if smiles not in found]
+
+
+def _merge_batch(
+    cache: ScaffoldCache,
+    keys: list[str],
+    cached: list[str | None],
+    misses: list[str],
+    computed: list[str],
+) -> list[str]:
+    """Complete the cached results by the computed ones, and store these.
+
+    Empty results (e.g. about lines rejected by `--strict`) are not stored."""
+    fresh = dict(zip(misses, computed))
+    valid = {smiles: result for smiles, result in fresh.items() if result}
+    if valid:
+        cache.put_many(valid)
+    return [
+        fresh[smiles] if result is None else result
+        for smiles, result in zip(keys, cached)
+    ]
+
+
+def saturate_cached(cache: ScaffoldCache, smiles_strings: list[str]) -> list[str]:
+    """Saturate a list of SMILES strings, computing only the cache misses."""
+    keys, cached, misses = _lookup_batch(cache, smiles_strings)
+    return _merge_batch(cache, keys, cached, misses, saturate_list(misses))
+
+
+def _completed(results: list[str]) -> Future[list[str]]:
+    """Provide a future already resolved, e.g. about an empty block."""
+    from concurrent.futures import Future
+
+    future: Future[list[str]] = Future()
+    future.set_result(results)
+    return future
+
+
+def saturate_batches(
+    batches: Iterable[tuple[int, list[str] | None]],
+    jobs: int = 1,
+    cache: ScaffoldCache | None = None,
+    check: bool = False,
+    shape: ResultShape | None = None,
+) -> Iterator[tuple[int, list[str] | None]]:
+    """Saturate tagged blocks of lines, optionally by a pool of processes.
+
+    With more than one job, the blocks are distributed to the processes
+    of a pool while the results are reported in the sequence of input.
+    No more than two blocks per process are pending at a time, which
+    keeps the memory demand independent of the size of the input.  With
+    a cache, only the SMILES missing in the cache are saturated (or sent
+    to the pool).  If profiled, the stage `saturate` of a pool records
+    the time waiting for its results.  With `check`, lines which are not
+    SMILES strings yield empty results; confer `saturate_valid_lines`.
+    A `shape` sets the form of the results (confer class `ResultShape`);
+    with levels, there is no cache.  Results to finish (renumbered, or
+    hashed) are finished in the pool, or with a cache, once merged with
+    its hits, as the cache holds the results unfinished (shared with the
+    SMILES of the CLI)."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    profile = _PROFILE
+    shape = shape or ResultShape()
+    saturate_function = shape.lines_function(check)
+    if shape.finished and cache is None:
+        saturate_function = functools.partial(_finish, saturate_function, shape)
+
+    def lookup(lines: list[str]) -> tuple[list[str], list[str | None], list[str]]:
+        assert cache is not None
+        start = time.perf_counter()
+        keys, cached, misses = _lookup_batch(cache, lines, check)
+        if profile is not None:
+            profile.record("cache", start, lines, [])
+        return keys, cached, misses
+
+    def merge(
+        keys: list[str],
+        cached: list[str | None],
+        misses: list[str],
+        computed: list[str],
+    ) -> list[str]:
+        assert cache is not None
+        start = time.perf_counter()
+        results = _merge_batch(cache, keys, cached, misses, computed)
+        if profile is not None:
+            profile.record("cache", start, [], results)
+        return shape.finish(results)
+
+    def saturate(lines: list[str]) -> list[str]:
+        start = time.perf_counter()
+        results = saturate_function(lines)
+        if profile is not None:
+            profile.record("saturate", start, lines, results)
+        return results
+
+    def wait(future: Future[list[str]]) -> list[str]:
+        start = time.perf_counter()
+        results = future.result()
+        if profile is not None and results:
+            profile.record("saturate", start, [], results)
+        return results
+
+    if jobs <= 1:
+        for index, lines in batches:
+            if not lines:
+                yield index, lines
+            elif cache is None:
+                yield index, saturate(lines)
+            else:
+                keys, cached, misses = lookup(lines)
+                yield index, merge(keys, cached, misses, saturate(misses))
+        return
+
+    pending: collections.deque[
+        tuple[
+            int,
+            tuple[list[str], list[str | None], list[str]] | None,
+            Future[list[str]] | None,
+        ]
+    ] = collections.deque()
+
+    def resolve() -> tuple[int, list[str] | None]:
+        index, lookup, future = pending.popleft()
+        if future is None:
+            return index, None
+        if lookup is None:
+            return index, wait(future)
+        return index, merge(*lookup, wait(future))
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for index, lines in batches:
+            if lines is None:
+                pending.append((index, None, None))
+            elif not lines:
+                pending.append((index, None, _completed([])))
+            elif cache is None:
+                future = executor.submit(saturate_function, lines)
+                pending.append((index, None, future))
+            else:
+                keys, cached, misses = lookup(lines)
+                future = executor.submit(saturate_function, misses)
+                pending.append((index, (keys, cached, misses), future))
+            while len(pending) > 2 * jobs:
+                yield resolve()
+        while pending:
+            yield resolve()
+
+
+def saturate_valid_batches(
+    batches: Iterable[tuple[int, list[str] | None]],
+    input_files: list[str],
+    jobs: int = 1,
+    cache: ScaffoldCache | None = None,
+    lenient: bool = False,
+    errors: TextIO | None = None,
+    shape: ResultShape | None = None,
+) -> Iterator[tuple[int, list[str] | None]]:
+    """As function `saturate_batches`, but skip lines not SMILES strings.
+
+    The lines rejected are reported to `errors` (by default, stderr) with
+    the name of their input file and their line number.  In lenient mode,
+    blank lines and comments are skipped silently, and a name after the
+    SMILES string is dropped; confer function `drop_rejected`."""
+    blocks: collections.deque[list[str] | None] = collections.deque()
+    numbers: dict[int, int] = {}
+
+    def remember() -> Iterator[tuple[int, list[str] | None]]:
+        for index, lines in batches:
+            blocks.append(lines)
+            if lenient and lines:
+                lines = drop_names(drop_comments(lines))
+            yield index, lines
+
+    for index, results in saturate_batches(remember(), jobs, cache, True, shape):
+        lines = blocks.popleft()
+        if lines and results is not None:
+            first = numbers.get(index, 0)
+            numbers[index] = first + len(lines)
+            file = input_files[index]
+            results = drop_rejected(results, lines, file, first, lenient, errors)
+        yield index, results
+
+
+def _close_record(sink: TextIO | None, tally: ScaffoldTally | None) -> None:
+    """Complete and close a permanent record; the CLI however stays open."""
+    if sink is None or sink is sys.stdout:
+        return
+    if tally is not None:
+        tally.write(sink)
+    sink.close()
+
+
+def process_input_files(
+    input_files: list[str],
+    output: bool = False,
+    jobs: int = 1,
+    cache: ScaffoldCache | None = None,
+    tally: ScaffoldTally | None = None,
+    compression: str | None = None,
+    validation: str | None = None,
+    errors: TextIO | None = None,
+    shape: ResultShape | None = None,
+    scaffold_index: ScaffoldIndex | None = None,
+) -> None:
+    """Process input files with lists of SMILES strings.
+
+    The results are reported to the CLI, or (`output`) written into a
+    file `<stem>_sat.smi` next to the input file (compressed, if set);
+    the ones about stdin always to the CLI.  With more than one job,
+    the blocks of all input files enter one common pool of processes;
+    thus, the work on the next file already starts while the previous
+    one is completed.  An optional cache is shared by all input files.
+
+    With a tally, the results are counted instead.  The caller reports
+    the tally about the CLI; each permanent record gets a tally of its
+    own, written when the record is closed.
+
+    With `validation` (`"strict"`, or `"lenient"`), lines which are not
+    SMILES strings are skipped, and reported to `errors`; confer function
+    `saturate_valid_batches`.  A `shape` sets the form of the results
+    (confer class `ResultShape`).  An optional scaffold index gets the
+    results of all input files, besides their record."""
+    sink: TextIO | None = sys.stdout
+    record = tally
+    current = -1
+    if validation is None:
+        saturated = saturate_batches(
+            read_listings(input_files), jobs, cache, shape=shape
+        )
+    else:
+        saturated = saturate_valid_batches(
+            read_listings(input_files),
+            input_files,
+            jobs,
+            cache,
+            validation == "lenient",
+            errors,
+            shape,
+        )
+    try:
+        for index, results in saturated:
+            file = input_files[index]
+            if index != current:
+                current = index
+                _close_record(sink, record)
+                sink, record = sys.stdout, tally
+                if results is not None and output and file != STDIN:
+                    record = None if tally is None else tally.empty_copy()
+                    new_file = output_file_name(file, compression=compression)
+                    try:
+                        sink = open_file(
+                            new_file,
+                            "w",
+                            compression,
+                            encoding="utf-8",
+                            buffering=WRITE_BUFFER_SIZE,
+                        )
+                    except OSError:
+                        sink = None
+                        print(f"file {new_file} is not accessible")
+            if results is None:
+                print(f"file {file} is not accessible")
+                continue
+            if scaffold_index is not None:
+                scaffold_index.add(index, file, results)
+            if sink is None:
+                continue
+            elif record is not None:
+                record.add(results, file, index)
+            else:
+                write_record(sink, results)
+    finally:
+        _close_record(sink, record)
+
+
+def read_mapped_listings(
+    input_files: list[str], block_size: int = READ_BLOCK_SIZE
+) -> Iterator[tuple[int, bytes | None]]:
+    """Read input files by memory map in blocks of complete lines.
+
+    The blocks are bytes, tagged by the file's index; each block ends at
+    a line feed found in the raw data (except the last one of a file
+    possibly lacking it).  Like function `read_listings`, each file
+    contributes an empty block first, and `None` if not accessible.
+    A compressed file (or stdin) can not be mapped; it is read by a
+    thread reading ahead instead."""
+    import mmap
+
+    profile = _PROFILE
+    for index, file in enumerate(input_files):
+        try:
+            compression = compression_of(file)
+            if compression is not None or file == STDIN:
+                with open_file(file, "rb", compression) as packed:
+                    yield index, b""
+                    with contextlib.closing(
+                        read_ahead(_read_blocks(packed, block_size))
+                    ) as ahead:
+                        for block in ahead:
+                            yield index, block
+                continue
+            with open(file, mode="rb") as source:
+                yield index, b""
+                size = os.fstat(source.fileno()).st_size
+                if size == 0:
+                    continue
+                with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    start = 0
+                    while start < size:
+                        begin = time.perf_counter()
+                        end = mapped.find(b"\n", min(start + block_size, size) - 1)
+                        end = size if end == -1 else end + 1
+                        block = mapped[start:end]
+                        if profile is not None:
+                            profile.record_block("read", begin, block, block)
+                        yield index, block
+                        start = end
+        except _decompression_errors():
+            yield index, None
+
+
+def _read_blocks(source: IO[bytes], block_size: int) -> Iterator[bytes]:
+    """Read a binary stream in blocks of complete lines."""
+    profile = _PROFILE
+    while True:
+        start = time.perf_counter()
+        block = b"".join(source.readlines(block_size))
+        if profile is not None:
+            profile.record_block("read", start, block, block)
+        if not block:
+            return
+        yield block
+
+
+def saturate_blocks(
+    blocks: Iterable[tuple[int, bytes | None]], jobs: int = 1
+) -> Iterator[tuple[int, bytes | None]]:
+    """Saturate tagged blocks of bytes, optionally by a pool of processes.
+
+    Confer function `saturate_batches` about the pool, and the sequence of
+    the results."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    profile = _PROFILE
+
+    def saturate(block: bytes) -> bytes:
+        start = time.perf_counter()
+        result = saturate_block(block)
+        if profile is not None:
+            profile.record_block("saturate", start, block, result)
+        return result
+
+    if jobs <= 1:
+        for index, block in blocks:
+            yield index, saturate(block) if block else block
+        return
+
+    pending: collections.deque[tuple[int, Future[bytes] | None]]
+    pending = collections.deque()
+
+    def resolve() -> tuple[int, bytes | None]:
+        index, future = pending.popleft()
+        if future is None:
+            return index, None
+        start = time.perf_counter()
+        result = future.result()
+        if profile is not None and result:
+            profile.record_block("saturate", start, b"", result)
+        return index, result
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for index, block in blocks:
+            if block is None:
+                pending.append((index, None))
+            else:
+                pending.append((index, executor.submit(saturate_block, block)))
+            while len(pending) > 2 * jobs:
+                yield resolve()
+        while pending:
+            yield resolve()
+
+
+def _binary_stdout() -> BinaryIO:
+    """Provide the binary layer of the CLI, the text layer flushed."""
+    sys.stdout.flush()
+    return getattr(sys.stdout, "buffer", None) or io.BytesIO()
+
+
+def process_mapped_files(
+    input_files: list[str],
+    output: bool = False,
+    jobs: int = 1,
+    compression: str | None = None,
+) -> None:
+    """Process input files by memory map, as bytes rather than text.
+
+    This is the counterpart of function `process_input_files` for large
+    ASCII listings: neither the input, nor the output pass the layer of
+    text decoding and encoding, and no string is allocated per line."""
+    stdout = _binary_stdout()
+    sink: IO[bytes] | None = stdout
+    current = -1
+    profile = _PROFILE
+    try:
+        for index, block in saturate_blocks(read_mapped_listings(input_files), jobs):
+            file = input_files[index]
+            if index != current:
+                current = index
+                if sink is not None and sink is not stdout:
+                    sink.close()
+                sink = stdout
+                if block is not None and output and file != STDIN:
+                    new_file = output_file_name(file, compression=compression)
+                    try:
+                        sink = open_file(
+                            new_file, "wb", compression, buffering=WRITE_BUFFER_SIZE
+                        )
+                    except OSError:
+                        sink = None
+                        stdout.write(f"file {new_file} is not accessible\n".encode())
+            if block is None:
+                stdout.write(f"file {file} is not accessible\n".encode())
+            elif sink is not None and block:
+                start = time.perf_counter()
+                sink.write(block)
+                if profile is not None:
+                    profile.record_block("write", start, block, block)
+    finally:
+        if sink is not None and sink is not stdout:
+            sink.close()
+        stdout.flush()
+
+
+class IncrementalState:
+    """Progress of the incremental processing of one input file.
+
+    The state is kept as JSON in a file next to the permanent record: the
+    number of bytes of the input file processed, their SHA-256 checksum,
+    and the size of the permanent record written about them."""
+
+    def __init__(self, file: str) -> None:
+        import hashlib
+        import json
+
+        self.file = file
+        self.offset = 0
+        self.record = 0
+        self.sha256 = ""
+        self._digest = hashlib.sha256()
         try:
             with open(file, mode="r", encoding="utf-8") as source:
-                for line in source:
-                    smiles = str(line).strip()
-                    print(process_smiles(smiles))
-        except OSError:
-            print(f"file {file} is not accessible")
+                saved = json.load(source)
+            self.offset = int(saved["offset"])
+            self.record = int(saved["record"])
+            self.sha256 = str(saved["sha256"])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def resume(self, source: IO[bytes], record_file: str) -> bool:
+        """Read past the part of the input processed earlier, if unaltered.
+
+        Otherwise (or if the permanent record is shorter than noted), the
+        input is rewound, and the state reset to its start."""
+        import hashlib
+
+        remaining = self.offset
+        while remaining > 0:
+            chunk = source.read(min(remaining, READ_BLOCK_SIZE))
+            if not chunk:
+                break
+            self._digest.update(chunk)
+            remaining -= len(chunk)
+        if (
+            self.offset > 0
+            and remaining == 0
+            and self._digest.hexdigest() == self.sha256
+            and os.path.isfile(record_file)
+            and os.path.getsize(record_file) >= self.record
+        ):
+            return True
+        source.seek(0)
+        self.offset = 0
+        self.record = 0
+        self._digest = hashlib.sha256()
+        return False
+
+    def read(
+        self, source: IO[bytes], block_size: int = READ_BLOCK_SIZE
+    ) -> Iterator[list[str]]:
+        """Read the complete lines appended, in blocks; advance the state.
+
+        A last line lacking its line feed is possibly still written by an
+        other program, thus left for a later run."""
+        while lines := source.readlines(block_size):
+            if not lines[-1].endswith(b"\n"):
+                lines.pop()
+                if not lines:
+                    return
+            block = b"".join(lines)
+            self._digest.update(block)
+            self.offset += len(block)
+            yield [line.decode("utf-8") for line in lines]
+
+    def save(self, record: int) -> None:
+        """Note the size of the permanent record, and save the state."""
+        import json
+
+        self.record = record
+        self.sha256 = self._digest.hexdigest()
+        state = {"offset": self.offset, "sha256": self.sha256, "record": record}
+        with open(self.file + ".tmp", mode="w", encoding="utf-8") as newfile:
+            json.dump(state, newfile)
+        os.replace(self.file + ".tmp", self.file)
+
+
+def process_incremental(
+    input_files: list[str],
+    jobs: int = 1,
+    cache: ScaffoldCache | None = None,
+    compression: str | None = None,
+) -> None:
+    """Process the lines appended to input files since the last run.
+
+    The results are appended to the permanent record `<stem>_sat.smi`
+    (compressed, if set) as long as the part of the input file processed
+    earlier is unaltered; otherwise, the input file is processed in full.
+    Confer class `IncrementalState` about the state file next to the
+    record, and function `saturate_batches` about jobs and cache."""
+    for file in input_files:
+        new_file = output_file_name(file, compression=compression)
+        state = IncrementalState(new_file + ".state")
+        try:
+            with open_file(file, "rb", compression_of(file)) as source:
+                resume = state.resume(source, new_file)
+                if resume:
+                    os.truncate(new_file, state.record)
+                batches = ((0, lines) for lines in state.read(source))
+                with open_file(
+                    new_file,
+                    "a" if resume else "w",
+                    compression,
+                    encoding="utf-8",
+                    buffering=WRITE_BUFFER_SIZE,
+                ) as sink:
+                    for _, results in saturate_batches(batches, jobs, cache):
+                        write_record(sink, results or [])
+            state.save(os.path.getsize(new_file))
+        except _decompression_errors() as error:
+            print(f"file {getattr(error, 'filename', None) or file} is not accessible")
+
+
+def find_column(header: list[str], column: str) -> int | None:
+    """Locate a column by its name, or by its number counted from 1."""
+    if column in header:
+        return header.index(column)
+    if column.isdigit() and 0 < int(column) <= len(header):
+        return int(column) - 1
+    return None
+
+
+def _saturate_rows(
+    rows: list[list[str]],
+    index: int,
+    saturate: Callable[[list[str]], list[str]],
+) -> list[list[str]]:
+    """Append the saturated SMILES of one column to a block of rows."""
+    values = [row[index].strip() if index < len(row) else "" for row in rows]
+    return [row + [result] for row, result in zip(rows, saturate(values))]
+
+
+def _write_rows(
+    sink: TextIO,
+    rows: list[list[str]],
+    index: int,
+    saturate: Callable[[list[str]], list[str]],
+) -> None:
+    """Write a block of tab-separated rows with the saturated column."""
+    if rows:
+        write_record(
+            sink, ["\t".join(row) for row in _saturate_rows(rows, index, saturate)]
+        )
+
+
+def saturate_table(
+    source: TextIO,
+    sink: TextIO,
+    column: str,
+    table_format: str = "tsv",
+    saturate: Callable[[list[str]], list[str]] = saturate_list,
+) -> bool:
+    """Append a column of saturated SMILES to a table, block by block.
+
+    The first row (in a .dwar file, the first one after the header block)
+    names the columns; the saturated column is named after the one with
+    the SMILES, e.g. `Scaffold (saturated)`.  Other lines of a .dwar file
+    (the header block; after the rows, any block starting with `<`, e.g.
+    DataWarrior's properties, hit lists, or details) are passed on
+    unaltered.  Report `False` if the column is missing."""
+    import csv
+
+    if table_format == "csv":
+        reader = csv.reader(source)
+        writer = csv.writer(sink, lineterminator="\n")
+        header = next(reader, None)
+        if header is None:
+            return True
+        index = find_column(header, column)
+        if index is None:
+            return False
+        writer.writerow(header + [f"{header[index]} (saturated)"])
+        while batch := list(itertools.islice(reader, BATCH_SIZE)):
+            writer.writerows(_saturate_rows(batch, index, saturate))
+        return True
+
+    index = None
+    trailer = False
+    rows: list[list[str]] = []
+    for lines in read_batches(source):
+        for line in lines:
+            if trailer:
+                sink.write(line)
+            elif index is None and table_format == "dwar" and line.startswith("<"):
+                sink.write(line)
+            elif index is None:
+                header = line.rstrip("\r\n").split("\t")
+                index = find_column(header, column)
+                if index is None:
+                    return False
+                sink.write("\t".join(header + [f"{header[index]} (saturated)"]))
+                sink.write("\n")
+            elif table_format == "dwar" and line.startswith("<"):
+                _write_rows(sink, rows, index, saturate)
+                rows = []
+                trailer = True
+                sink.write(line)
+            else:
+                rows.append(line.rstrip("\r\n").split("\t"))
+        if index is not None:
+            _write_rows(sink, rows, index, saturate)
+        rows = []
+    return True
+
+
+def process_table_files(
+    input_files: list[str],
+    column: str,
+    output: bool = False,
+    table_format: str | None = None,
+    cache: ScaffoldCache | None = None,
+    compression: str | None = None,
+) -> None:
+    """Process tables (tab-/comma-separated, .dwar) with a SMILES column.
+
+    The tables are streamed to the CLI, or (`output`) into files like
+    `example_sat.dwar` about `example.dwar` (compressed, if set); a
+    table read from stdin is streamed to the CLI.  The format is set by
+    the extension of the file name (a compressed file like
+    `example.csv.gz` included) unless `table_format` is given."""
+    saturate: Callable[[list[str]], list[str]] = saturate_list
+    if cache is not None:
+        saturate = functools.partial(saturate_cached, cache)
+    for file in input_files:
+        extension = os.path.splitext(plain_file_name(file))[1]
+        fmt = table_format or TABLE_FORMATS.get(extension.lower(), "tsv")
+        new_file = output_file_name(file, extension, compression)
+        output_file = output and file != STDIN
+        try:
+            with open_file(
+                file, "r", compression_of(file), encoding="utf-8", newline=""
+            ) as source:
+                if not output_file:
+                    found = saturate_table(source, sys.stdout, column, fmt, saturate)
+                else:
+                    with open_file(
+                        new_file,
+                        "w",
+                        compression,
+                        encoding="utf-8",
+                        newline="",
+                        buffering=WRITE_BUFFER_SIZE,
+                    ) as newfile:
+                        found = saturate_table(source, newfile, column, fmt, saturate)
+        except _decompression_errors() as error:
+            print(f"file {getattr(error, 'filename', None) or file} is not accessible")
+            continue
+        if not found:
+            print(f"file {file} lacks column {column}", file=sys.stderr)
+            if output_file:
+                os.remove(new_file)
+
+
+async def serve_stream(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    saturate: Callable[[list[str]], list[str]] = saturate_list,
+    executor: ProcessPoolExecutor | None = None,
+    concurrency: int = SERVER_CONCURRENCY,
+) -> None:
+    """Answer the requests of one client, one line per request.
+
+    A request is a line of one or more SMILES strings separated by white
+    space; its answer is a line of the saturated SMILES strings separated
+    by tabulators.  The client may send further requests prior to the
+    answers (pipelining); up to `concurrency` of them are in progress at
+    a time, and the answers keep the sequence of the requests.  Requests
+    of at least `SERVER_OFFLOAD` SMILES strings are saturated by the pool
+    of processes, if any; the others are answered right away."""
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    pending: asyncio.Queue[asyncio.Future[list[str]] | None]
+    pending = asyncio.Queue(maxsize=concurrency)
+
+    async def respond() -> None:
+        while (future := await pending.get()) is not None:
+            results = await future
+            if writer.is_closing():
+                continue
+            writer.write("\t".join(results).encode() + b"\n")
+            if pending.empty():
+                with contextlib.suppress(ConnectionError):
+                    await writer.drain()
+
+    responder = asyncio.create_task(respond())
+    try:
+        with contextlib.suppress(ConnectionError, ValueError):  # too long
+            while line := await reader.readline():
+                smiles_strings = line.decode("utf-8", errors="replace").split()
+                if executor is not None and len(smiles_strings) >= SERVER_OFFLOAD:
+                    future = loop.run_in_executor(
+                        executor, saturate_list, smiles_strings
+                    )
+                else:
+                    future = loop.create_future()
+                    future.set_result(saturate(smiles_strings))
+                await pending.put(future)
+        await pending.put(None)
+        await responder
+    finally:
+        responder.cancel()
+        writer.close()
+
+
+def _is_stream(file: TextIO) -> bool:
+    """Check a file is a pipe, or a socket, thus suitable for asyncio."""
+    import stat
+
+    try:
+        mode = os.fstat(file.fileno()).st_mode
+    except (OSError, ValueError):
+        return False
+    return stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode)
+
+
+async def _serve(
+    socket_path: str | None,
+    saturate: Callable[[list[str]], list[str]],
+    executor: ProcessPoolExecutor | None,
+    concurrency: int,
+) -> None:
+    """Serve stdin and stdout, or the clients of a Unix domain socket.
+
+    Stopped by SIGTERM or SIGINT, the server closes the connections to
+    its clients once the requests received are answered."""
+    import asyncio
+    import signal
+
+    loop = asyncio.get_running_loop()
+    clients: dict[asyncio.StreamWriter, asyncio.Task[Any] | None] = {}
+
+    async def handle(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        clients[writer] = asyncio.current_task()
+        try:
+            await serve_stream(reader, writer, saturate, executor, concurrency)
+        finally:
+            del clients[writer]
+
+    if socket_path is None:
+        reader = asyncio.StreamReader(limit=SERVER_LINE_LIMIT)
+        await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+        )
+        sys.stdout.flush()
+        transport, protocol = await loop.connect_write_pipe(
+            asyncio.streams.FlowControlMixin, sys.stdout
+        )
+        await handle(reader, asyncio.StreamWriter(transport, protocol, reader, loop))
+        return
+
+    stopped = asyncio.Event()
+    for signal_number in (signal.SIGTERM, signal.SIGINT):
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(signal_number, stopped.set)
+    server = await asyncio.start_unix_server(
+        handle, socket_path, limit=SERVER_LINE_LIMIT
+    )
+    async with server:
+        await stopped.wait()
+        tasks = [task for task in clients.values() if task is not None]
+        for writer in list(clients):
+            writer.transport.close()  # the client's requests end here
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def serve(
+    socket_path: str | None = None,
+    jobs: int = 1,
+    concurrency: int = SERVER_CONCURRENCY,
+    cache: ScaffoldCache | None = None,
+) -> None:
+    """Run a server saturating SMILES strings until stopped.
+
+    This spares the start of Python, and the import of the module, about
+    each batch of a workflow.  The server answers requests read from
+    stdin on stdout (until stdin is closed), or (`socket_path`) any
+    number of clients connecting to a Unix domain socket (until SIGTERM,
+    or SIGINT).  Confer function `serve_stream` about the protocol.
+    With more than one job, large requests enter a pool of processes;
+    an optional cache is shared by all clients."""
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor
+
+    saturate: Callable[[list[str]], list[str]] = saturate_list
+    if cache is not None:
+        saturate = functools.partial(saturate_cached, cache)
+    if socket_path is None and not (_is_stream(sys.stdin) and _is_stream(sys.stdout)):
+        # e.g. a terminal, or a regular file, which asyncio can not poll
+        for line in sys.stdin:
+            sys.stdout.write("\t".join(saturate(line.split())) + "\n")
+        return
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        asyncio.run(_serve(socket_path, saturate, executor, concurrency))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if socket_path is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(socket_path)
+
+
+def process_inputs(inputs: list[str]) -> None:
+    """Process SMILES strings, and input files, without further options."""
+    smiles_strings = [arg for arg in inputs if not is_input_file(arg)]
+    if smiles_strings:
+        write_record(sys.stdout, [process_smiles(smiles) for smiles in smiles_strings])
+
+    input_files = [arg for arg in inputs if is_input_file(arg)]
+    if input_files:
+        process_input_files(input_files)
 
 
 def main(arg_list=None) -> None:
-    """Join the functions."""
+    """Join the functions.
+
+    If the reader of the output (e.g., `head`) closes the pipe early, the
+    script stops quietly, like a filter killed by SIGPIPE."""
+    try:
+        _main(arg_list)
+    except BrokenPipeError:
+        # flushing stdout at exit would fail again, and report it
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(EXIT_BROKEN_PIPE)
+
+
+def _main(arg_list: list[str] | None) -> None:
+    """Run the CLI; the parser is built only if options are set."""
+    arguments = sys.argv[1:] if arg_list is None else arg_list
+    if arguments and not any(argument.startswith("-") for argument in arguments):
+        # the frequent call without options spares argparse and its parser
+        process_inputs(arguments)
+        return
+
     args = get_args(arg_list)
+    if not (args.profile or args.profile_format):
+        run(args)
+        return
+
+    with profiling() as profile:
+        run(args)
+    if args.profile_format == "json":
+        import json
+
+        print(json.dumps(profile.as_dict(), indent=2), file=sys.stderr)
+    else:
+        print(profile.report(), file=sys.stderr)
+
+
+def run(args: argparse.Namespace) -> None:
+    """Process the inputs as set by the command-line arguments."""
+    if args.compress == "zstd" and _zstd_module() is None:
+        sys.exit("compression by zstd needs Python 3.14, or package zstandard")
+    cache: ScaffoldCache | None = None
+    if args.cache_file is not None:
+        cache = PersistentCache(args.cache_file, args.cache_size)
+    elif args.cache_size > 0:
+        cache = ScaffoldCache(args.cache_size)
+    shape = ResultShape.from_args(args)
+    saturate: Callable[[str], str] = process_smiles if cache is None else cache
+    if shape.stages:
+        saturate = compile_stages(shape.stages)
+    if args.serve or args.socket:
+        jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+        serve(args.socket, jobs, args.concurrency, cache)
+        if cache is not None:
+            print(cache.report(), file=sys.stderr)
+            cache.close()
+        return
+    if args.lookup is not None:
+        import sqlite3
+
+        try:
+            for found in lookup_scaffolds(args.lookup, read_queries(args.inputs)):
+                print(*found, sep="\t")
+        except (sqlite3.Error, KeyError):
+            sys.exit(f"file {args.lookup} is not an index")
+        return
+    tally = None
+    if args.unique or args.counts or args.first_line:
+        tally = ScaffoldTally(args.counts, args.first_line, args.max_unique)
+
+    errors = sys.stderr
+    if args.errors is not None:
+        errors = open(args.errors, mode="w", encoding="utf-8")
 
-    smiles_strings = [arg for arg in args.inputs if not os.path.isfile(arg)]
+    smiles_strings = [arg for arg in args.inputs if not is_input_file(arg)]
     if smiles_strings:
-        for smiles in smiles_strings:
-            print(process_smiles(smiles))
+        if shape.levels:
+            results = _level_lines(shape.levels, smiles_strings)
+        elif args.validation is None:
+            results = [saturate(smiles) for smiles in smiles_strings]
+        else:
+            lenient = args.validation == "lenient"
+            keys = smiles_strings
+            if lenient:
+                keys = drop_names(drop_comments(smiles_strings))
+            results = drop_rejected(
+                saturate_valid_lines(keys),
+                smiles_strings,
+                "argument",
+                0,
+                lenient,
+                errors,
+            )
+        results = shape.finish(results)
+        if tally is None:
+            write_record(sys.stdout, results)
+        else:
+            tally.add(results)
 
-    input_files = [arg for arg in args.inputs if os.path.isfile(arg)]
+    input_files = [arg for arg in args.inputs if is_input_file(arg)]
+    index = None
+    if input_files and args.index is not None:
+        index = ScaffoldIndex(args.index, shape)
     if input_files:
-        process_input_files(input_files)
+        jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+        if args.column is not None:
+            process_table_files(
+                input_files, args.column, args.output, args.format, cache, args.compress
+            )
+        elif args.incremental:
+            process_incremental(input_files, jobs, cache, args.compress)
+        elif args.mmap:
+            process_mapped_files(input_files, args.output, jobs, args.compress)
+        else:
+            try:
+                process_input_files(
+                    input_files,
+                    args.output,
+                    jobs,
+                    cache,
+                    tally,
+                    args.compress,
+                    args.validation,
+                    errors,
+                    shape,
+                    index,
+                )
+            except BaseException:
+                if index is not None:
+                    index.discard()
+                raise
+            if index is not None:
+                index.close()
+                print(index.report(), file=sys.stderr)
+    if errors is not sys.stderr:
+        errors.close()
+
+    if tally is not None:
+        tally.write(sys.stdout)
+
+    if cache is not None:
+        print(cache.report(), file=sys.stderr)
+        cache.close()
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -270,4 +270,34 @@ NCC[C@@H](C)O
     os.remove("checker.smi")
 
 
+@pytest.mark.blackbox
+@pytest.mark.parametrize("arguments", [["-"], []])
+def test_pass_stdin_to_cli(arguments):
+    """saturate multiple SMILES from stdin, e.g. as filter in a pipeline"""
+    molecules = "c1ccncc1\n[O-]c1ccccc1\nc1c[Sn]cc1\n"
+
+    command = ["python", SCRIPT, *arguments]
+    result = sub.run(command, input=molecules, capture_output=True, text=True)
+
+    assert result.stdout == "C1CCNCC1\n[O-]C1CCCCC1\nC1C[Sn]CC1\n"
+
+
+@pytest.mark.blackbox
+def test_stop_quietly_at_closed_pipe():
+    """stop without a traceback if the reader (e.g., head) closes the pipe"""
+    with open(file="checker.smi", mode="wt", encoding="utf-8") as newfile:
+        newfile.write("c1ccncc1\n" * 200_000)
+
+    command = ["python", SCRIPT, "checker.smi"]
+    with sub.Popen(command, stdout=sub.PIPE, stderr=sub.PIPE) as process:
+        assert process.stdout.readline() == b"C1CCNCC1\n"
+        process.stdout.close()
+        stderr = process.stderr.read()
+
+    assert process.returncode == 141
+    assert stderr == b""
+
+    os.remove("checker.smi")
+
+
 # END
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# name:   test_differential.py
+# author: nbehrnd@yahoo.com
+# date:   [2026-10-18 Sun]
+# edit:
+#
+"""differential tests of the engines of saturate_murcko_scaffolds.py
+
+A generator of random, yet valid SMILES strings (by a small grammar with
+bracket atoms, charges, isotopes, ring closures, stereo markers, bonds,
+branches and disconnected fragments) feeds a reference written apart
+from the module (which rebuilds each bracket atom part by part, rather
+than by the module's parser) and each path of the module (sequential
+chain, single pass, batch, bytes, the tokenizer shared with the
+validation, the ones of the levels and of the stages, the cache, the
+pool of processes).
+Mismatches are reported with an example shrunk as far as it still fails.
+
+Pytest runs a sample of the cases (`pytest -m differential`); the script
+runs as many as requested from the root of the repository, shared by
+processes on all CPUs (`--jobs`), e.g.
+
+python tests/test_differential.py --cases 1000000
+
+The same seed yields the same cases, regardless of the number of jobs.
+"""
+
+import argparse
+import functools
+import itertools
+import os
+import random
+import re
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+
+from saturate_murcko_scaffolds.saturate_murcko_scaffolds import (  # noqa: E402
+    ScaffoldCache,
+    process_smiles,
+    process_smiles_bytes,
+    process_smiles_sequential,
+    saturate_batches,
+    saturate_block,
+    saturate_cached,
+    saturate_levels,
+    saturate_list,
+    saturate_valid_lines,
+    transform_list,
+    validate_smiles,
+)
+
+# Number of cases checked by pytest, and the SMILES strings per batch.
+CASES = 20_000
+BATCH = 1_000
+
+ORGANIC_ATOMS = ["C", "C", "C", "N", "O", "S", "P", "B", "F", "Cl", "Br", "I"]
+AROMATIC_ATOMS = ["c", "c", "c", "n", "o", "s", "p", "b"]
+BRACKET_SYMBOLS = [
+    *["C", "N", "O", "S", "P", "H", "*", "Se", "Sn", "Si", "Sc", "Fe", "Na"],
+    *["c", "c", "n", "n", "o", "s", "p", "b", "se", "as", "te", "sn"],
+]
+CHIRALITY = ["", "", "", "@", "@@", "@TH2", "@SP3", "@OH12"]
+CHARGES = ["", "", "", "+", "-", "+2", "-3", "++", "--"]
+BONDS = ["", "", "", "", "=", "#", "/", "\\", "-", ":", "$"]
+
+
+HYDROGENS = ["", "", "H", "H2", "H3"]
+
+# Units the minimization removes: bracket atoms, two-digit ring closure
+# labels, two-letter elements of the organic subset, and characters.
+TOKEN = r"\[[^\]]*\]?|%\d\d|Br|Cl|."
+RING_LABEL = r"%\d\d|\d"
+
+# The rules of the reference: bond symbols dropped, aromatic symbols
+# capitalized, and bare aromatic atoms of the organic subset unbracketed.
+REFERENCE_BONDS = str.maketrans("", "", "=#/\\")
+REFERENCE_AROMATIC = {"b", "c", "n", "o", "p", "s", "as", "se", "sn", "te"}
+REFERENCE_BARE = {"B", "C", "N", "O", "P", "S"}
+
+
+def pick(rng: random.Random, sequence: list[str]) -> str:
+    """Pick an item at random; faster than `rng.choice`."""
+    return sequence[int(rng.random() * len(sequence))]
+
+
+def below(rng: random.Random, limit: int) -> int:
+    """Pick an integer from 0 up to (excluding) a limit."""
+    return int(rng.random() * limit)
+
+
+def bracket_atom(rng: random.Random) -> str:
+    """Generate an atom in square brackets, e.g. `[13cH+:2]`."""
+    isotope = str(1 + below(rng, 40)) if rng.random() < 0.1 else ""
+    label = f":{below(rng, 100)}" if rng.random() < 0.1 else ""
+    return (
+        f"[{isotope}{pick(rng, BRACKET_SYMBOLS)}{pick(rng, CHIRALITY)}"
+        f"{pick(rng, HYDROGENS)}{pick(rng, CHARGES)}{label}]"
+    )
+
+
+def atom(rng: random.Random) -> str:
+    """Generate an atom of the organic subset, or in square brackets."""
+    chance = rng.random()
+    if chance < 0.2:
+        return bracket_atom(rng)
+    if chance < 0.6:
+        return pick(rng, AROMATIC_ATOMS)
+    return pick(rng, ORGANIC_ATOMS)
+
+
+def ring_label(rng: random.Random, in_use: list[str]) -> str:
+    """Pick a ring closure label not open yet, e.g. `1`, or `%12`."""
+    while True:
+        number = 1 + below(rng, 9) if rng.random() < 0.9 else 10 + below(rng, 90)
+        label = str(number) if number < 10 else f"%{number}"
+        if label not in in_use:
+            return label
+
+
+def fragment(rng: random.Random, atoms: int) -> str:
+    """Generate one connected fragment of a number of atoms.
+
+    Branches are opened after an atom and closed later on; each ring
+    closure opened is closed at a later atom."""
+    pieces = [atom(rng)]
+    open_rings: list[str] = []
+    depth = 0
+    for _ in range(atoms - 1):
+        if open_rings and rng.random() < 0.3:
+            pieces.append(
+                pick(rng, BONDS) + open_rings.pop(below(rng, len(open_rings)))
+            )
+        elif rng.random() < 0.2:
+            open_rings.append(ring_label(rng, open_rings))
+            pieces.append(open_rings[-1])
+        if depth and rng.random() < 0.25:
+            pieces.append(")")
+            depth -= 1
+        if rng.random() < 0.2:
+            pieces.append("(")
+            depth += 1
+        pieces.append(pick(rng, BONDS) + atom(rng))
+    if open_rings:
+        pieces.append(pick(rng, BONDS) + atom(rng) + "".join(open_rings))
+    pieces.append(")" * depth)
+    return "".join(pieces)
+
+
+def generate_smiles(rng: random.Random, max_atoms: int = 16) -> str:
+    """Generate a SMILES string of one to three fragments."""
+    return ".".join(
+        fragment(rng, 1 + below(rng, max_atoms))
+        for _ in range((1, 1, 1, 2, 3)[below(rng, 5)])
+    )
+
+
+def generate_batches(
+    cases: int, seed: int = 0, shard: int = 0, shards: int = 1
+) -> Iterator[list[str]]:
+    """Generate batches of SMILES strings, reproducibly by the seed.
+
+    Each batch draws from a generator of its own, seeded by the seed and
+    the index of the batch; thus, the batches may be split into shards
+    (every `shards`-th batch, from index `shard` on) checked in parallel."""
+    for index in range(shard, -(-cases // BATCH), shards):
+        rng = random.Random(f"{seed}:{index}")
+        size = min(cases - index * BATCH, BATCH)
+        yield [generate_smiles(rng) for _ in range(size)]
+
+
+def reference_bracket(content: str) -> str:
+    """Saturate the content of square brackets, the reference.
+
+    The content is taken apart as the generator composed it: isotope,
+    element symbol (of `BRACKET_SYMBOLS`, two letters first), and the
+    remainder (chirality, hydrogens, charge, atom class)."""
+    content = content.translate(REFERENCE_BONDS)
+    isotope = content[: len(content) - len(content.lstrip("0123456789"))]
+    rest = content[len(isotope) :]
+    size = 2 if rest[:2] in BRACKET_SYMBOLS else 1
+    symbol, rest = rest[:size], rest[size:]
+    if symbol not in REFERENCE_AROMATIC:
+        return f"[{content}]"
+    symbol = symbol.capitalize()
+    if not isotope and not rest and symbol in REFERENCE_BARE:
+        return symbol
+    return f"[{isotope}{symbol}{rest}]"
+
+
+def reference_smiles(smiles: str) -> str:
+    """Saturate a SMILES string, the reference."""
+    pieces = re.split(r"\[([^\]]*)\]", smiles)
+    pieces[0::2] = [
+        piece.translate(REFERENCE_BONDS).translate(str.maketrans("bcnops", "BCNOPS"))
+        for piece in pieces[0::2]
+    ]
+    pieces[1::2] = map(reference_bracket, pieces[1::2])
+    return "".join(pieces)
+
+
+def reference(smiles_strings: list[str]) -> list[str]:
+    """Saturate a batch by the reference."""
+    return [reference_smiles(smiles) for smiles in smiles_strings]
+
+
+def _bytes_engine(smiles_strings: list[str]) -> list[str]:
+    return saturate_block("\n".join(smiles_strings).encode()).decode().split("\n")[:-1]
+
+
+def _pool_engine(batches: Iterable[list[str]]) -> Iterator[list[str]]:
+    for _, results in saturate_batches(((0, batch) for batch in batches), jobs=2):
+        yield results or []
+
+
+def _per_batch(function: Callable[[list[str]], list[str]]) -> Callable:
+    return lambda batches: map(function, batches)
+
+
+# The engines compared with the reference; each maps batches to results.
+ENGINES: dict[str, Callable[[Iterable[list[str]]], Iterator[list[str]]]] = {
+    "process_smiles_sequential": _per_batch(
+        lambda batch: process_smiles_sequential("\n".join(batch)).split("\n")
+    ),
+    "process_smiles": _per_batch(lambda batch: [process_smiles(s) for s in batch]),
+    "process_smiles_bytes": _per_batch(
+        lambda batch: [process_smiles_bytes(s.encode()).decode() for s in batch]
+    ),
+    "saturate_list": _per_batch(saturate_list),
+    "saturate_block": _per_batch(_bytes_engine),
+    "saturate_valid_lines": _per_batch(saturate_valid_lines),
+    "saturate_levels": _per_batch(
+        lambda batch: [row[0] for row in saturate_levels(batch, ["saturated"])]
+    ),
+    "transform_list": _per_batch(lambda batch: transform_list(batch, ("saturate",))),
+    "saturate_cached": lambda batches: map(
+        functools.partial(saturate_cached, ScaffoldCache(4096)), batches
+    ),
+    "saturate_batches": _pool_engine,
+}
+
+
+def minimize(smiles: str, fails: Callable[[str], bool]) -> str:
+    """Shrink a failing SMILES string as long as it still fails.
+
+    Chunks of tokens (confer `TOKEN`), halving in length, are removed one
+    after the other (delta debugging), and so are both ends of each ring
+    closure, and both parentheses of each branch; a candidate has to
+    remain a valid SMILES string.  This is repeated until nothing more
+    is removed."""
+
+    def keeps(tokens: list[str]) -> bool:
+        candidate = "".join(tokens)
+        return (
+            bool(candidate) and validate_smiles(candidate) is None and fails(candidate)
+        )
+
+    tokens = re.findall(TOKEN, smiles)
+    while True:
+        before = len(tokens)
+        chunk = max(len(tokens) // 2, 1)
+        while True:
+            start = 0
+            while start < len(tokens):
+                candidate = tokens[:start] + tokens[start + chunk :]
+                if keeps(candidate):
+                    tokens = candidate
+                else:
+                    start += chunk
+            if chunk == 1:
+                break
+            chunk //= 2
+        for label in set(filter(re.compile(RING_LABEL).fullmatch, tokens)):
+            candidate = [token for token in tokens if token != label]
+            if keeps(candidate):
+                tokens = candidate
+        opened: list[int] = []
+        for position, token in enumerate(tokens):
+            if token == "(":
+                opened.append(position)
+            elif token == ")" and opened:
+                start = opened.pop()
+                candidate = tokens.copy()
+                candidate[start] = candidate[position] = ""
+                if keeps(candidate):
+                    tokens = candidate
+        tokens = [token for token in tokens if token]
+        if len(tokens) == before:
+            return "".join(tokens)
+
+
+def _fails(engine: str) -> Callable[[str], bool]:
+    """Test if an engine disagrees with the reference about a SMILES."""
+    function = ENGINES[engine]
+    return lambda smiles: list(function([[smiles]])) != [reference([smiles])]
+
+
+def compare(
+    engines: list[str], batches: Iterable[list[str]], limit: int = 5
+) -> dict[str, list[tuple[str, str, str, str]]]:
+    """Report the first mismatches of engines against the reference.
+
+    The batches are generated, and saturated by the reference, once; the
+    engines work on them in lockstep.  Each mismatch is a tuple of the
+    SMILES string, the minimized one, the result of the reference, and
+    the one of the engine."""
+    streams = itertools.tee(batches, len(engines) + 1)
+    outputs = [ENGINES[engine](stream) for engine, stream in zip(engines, streams[1:])]
+    mismatches: dict[str, list[tuple[str, str, str, str]]] = {e: [] for e in engines}
+    for batch, *results in zip(streams[0], *outputs):
+        expected = reference(batch)
+        for engine, result in zip(engines, results):
+            found = mismatches[engine]
+            if result == expected or len(found) >= limit:
+                continue
+            for smiles, wanted, got in itertools.zip_longest(
+                batch, expected, result, fillvalue=""
+            ):
+                if got != wanted and len(found) < limit:
+                    minimized = minimize(smiles, _fails(engine))
+                    found.append((smiles, minimized, wanted, got))
+    return mismatches
+
+
+@pytest.mark.imported
+@pytest.mark.differential
+def test_generated_smiles_are_valid() -> None:
+    """Check the generator yields valid, yet varied SMILES strings."""
+    smiles_strings = next(generate_batches(2_000, seed=1))
+    assert all(validate_smiles(smiles) is None for smiles in smiles_strings)
+    for feature in ["[", "+", "@", "%", ".", "(", "/", "se]", "H2"]:
+        assert any(feature in smiles for smiles in smiles_strings), feature
+
+
+@pytest.mark.imported
+@pytest.mark.differential
+@pytest.mark.parametrize(
+    "smiles, expected",
+    [
+        ("[13cH+:2]1cc[se]c1", "[13CH+:2]1CC[Se]C1"),
+        ("[c]=[n][sn][Sc][C@@H]", "CN[Sn][Sc][C@@H]"),
+        ("[nH]1cc[c-]c1/C=C\\[te]", "[NH]1CC[C-]C1CC[Te]"),
+        ("[2c][o+][Se][as@TH2]", "[2C][O+][Se][As@TH2]"),
+    ],
+)
+def test_reference(smiles, expected) -> None:
+    """Check the reference by hand, as the engines are checked by it."""
+    assert reference_smiles(smiles) == expected
+
+
+@pytest.mark.imported
+@pytest.mark.differential
+def test_engines_agree_with_reference() -> None:
+    """Check each engine against the reference on random SMILES."""
+    mismatches = compare(list(ENGINES), generate_batches(CASES))
+    assert mismatches == {engine: [] for engine in ENGINES}
+
+
+@pytest.mark.imported
+@pytest.mark.differential
+def test_minimize() -> None:
+    """Check the shrinking of a failing example keeps a valid SMILES."""
+    smiles = "CC(=O)c1ccc2[se]c(C#N)cc2c1"
+    assert minimize(smiles, lambda candidate: "[se]" in candidate) == "[se]"
+    smiles = "C1CC[se]CC1"
+    assert minimize(smiles, lambda candidate: "e]" in candidate) == "[se]"
+
+
+def get_args() -> argparse.Namespace:
+    """Collect the arguments of the CLI."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=1_000_000, help="default: 1M")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        choices=list(ENGINES),
+        default=list(ENGINES),
+        help="default: all",
+    )
+    parser.add_argument(
+        "--limit", type=int, default=5, help="mismatches reported per engine"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="processes sharing the cases (default: all CPUs)",
+    )
+    return parser.parse_args()
+
+
+def _compare_shard(
+    args: argparse.Namespace, shard: int
+) -> dict[str, list[tuple[str, str, str, str]]]:
+    batches = generate_batches(args.cases, args.seed, shard, args.jobs)
+    return compare(args.engines, batches, args.limit)
+
+
+def main() -> None:
+    """Compare the engines selected, and report mismatches and throughput."""
+    args = get_args()
+    start = time.perf_counter()
+    mismatches: dict[str, list[tuple[str, str, str, str]]]
+    mismatches = {engine: [] for engine in args.engines}
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        shards = range(args.jobs)
+        for shard in executor.map(functools.partial(_compare_shard, args), shards):
+            for engine, examples in shard.items():
+                mismatches[engine] = (mismatches[engine] + examples)[: args.limit]
+    elapsed = time.perf_counter() - start
+    print(f"{args.cases} cases, {elapsed:.1f} s")
+    for engine, found in mismatches.items():
+        print(f"{engine}: {len(found) or 'no'} mismatches")
+        for smiles, minimized, expected, result in found:
+            print(f"  {smiles}\n    minimized {minimized}")
+            print(f"    expected  {expected}\n    got       {result}")
+    sys.exit(1 if any(mismatches.values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
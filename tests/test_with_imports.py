@@ -11,8 +11,16 @@
 This file provides pytest checks for script `saturate_murcko_scaffolds.py`.
 Complementary to the ones in `test_blackbox.py`, this script imports and
 checks the script's functions individually."""
+
+import asyncio
+import gzip
+import io
+import json
+import lzma
 import os
 import shlex
+import subprocess
+import sys
 
 import pytest
 
@@ -23,12 +31,52 @@ from saturate_murcko_scaffolds.saturate_murcko_scaffolds import (
     saturate_oxygen,
     saturate_phosphorus,
     saturate_sulfur,
+    saturate_element,
+    AROMATIC_ELEMENTS,
+    STAGES,
     process_smiles,
+    process_smiles_sequential,
+    saturate_bracket_atom,
+    saturate_list,
+    saturate_block,
+    process_smiles_bytes,
+    saturate_many,
     get_args,
     process_input_files,
+    read_batches,
+    ScaffoldCache,
+    ScaffoldTally,
+    saturate_batches,
+    saturate_stream,
+    profiling,
+    read_mapped_listings,
+    saturate_table,
+    compression_of,
+    read_ahead,
+    PersistentCache,
+    rules_fingerprint,
+    serve_stream,
+    validate_smiles,
+    saturate_valid_lines,
+    process_smiles_levels,
+    saturate_levels,
+    compile_stages,
+    transform_list,
+    renumber_rings,
+    scaffold_hash,
+    finish_lines,
+    ScaffoldIndex,
+    lookup_scaffolds,
+    ResultShape,
     main,
 )
 
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Budget of the import of the module in microseconds (cumulative, with the
+# bytecode cached); confer section "Start-up time" of the README.
+IMPORT_TIME_BUDGET_US = 30_000
+
 
 @pytest.mark.imported
 def test_butene() -> None:
@@ -106,6 +154,22 @@ def test_thiophene() -> None:
     assert saturate_carbon(saturate_sulfur(input_smiles)) == output_smiles
 
 
+@pytest.mark.imported
+def test_element_table() -> None:
+    """Check the per-element functions are derived from the table."""
+    assert {"b", "c", "n", "o", "p", "s", "as", "se", "te"} <= set(AROMATIC_ELEMENTS)
+    input_smiles = r"c1c[nH]c(o1)[s+]p"
+    for symbol, function in [
+        ("c", saturate_carbon),
+        ("n", saturate_nitrogen),
+        ("o", saturate_oxygen),
+        ("p", saturate_phosphorus),
+        ("s", saturate_sulfur),
+    ]:
+        assert saturate_element(input_smiles, symbol) == function(input_smiles)
+    assert saturate_element(input_smiles, "s") == r"c1c[nH]c(o1)[S+]p"
+
+
 @pytest.mark.imported
 def test_furfual() -> None:
     """Test reduction of furfural (aromaticity and carbonyl group)."""
@@ -122,6 +186,119 @@ def test_tetrabutyltinhydride() -> None:
     assert process_smiles(input_smiles) == output_smiles
 
 
+@pytest.mark.parametrize(
+    "token, reference",
+    [
+        (r"[c]", r"C"),
+        (r"[nH]", r"[NH]"),
+        (r"[sn]", r"[Sn]"),
+        (r"[SnH]", r"[SnH]"),
+        (r"[Sc]", r"[Sc]"),
+        (r"[O-]", r"[O-]"),
+        (r"[C@@H]", r"[C@@H]"),
+        (r"[c+]", r"[C+]"),
+        (r"[cH-]", r"[CH-]"),
+        (r"[n+2]", r"[N+2]"),
+        (r"[nH+]", r"[NH+]"),
+        (r"[13c]", r"[13C]"),
+        (r"[c@@H:7]", r"[C@@H:7]"),
+        (r"[b]", r"B"),
+        (r"[se]", r"[Se]"),
+        (r"[as]", r"[As]"),
+        (r"[te]", r"[Te]"),
+        (r"[Tc]", r"[Tc]"),
+        (r"[Cs+]", r"[Cs+]"),
+    ],
+)
+@pytest.mark.imported
+def test_saturate_bracket_atom(token, reference) -> None:
+    """Check the saturation of individual bracket atoms."""
+    assert saturate_bracket_atom(token) == reference
+
+
+@pytest.mark.imported
+def test_single_pass_equals_sequential_chain() -> None:
+    """Check the single pass against the chain for the demo's scaffolds."""
+    with open(os.path.join("demo", "input.smi"), mode="r", encoding="utf-8") as source:
+        for line in source:
+            smiles = line.strip()
+            assert process_smiles(smiles) == process_smiles_sequential(smiles)
+
+
+@pytest.mark.parametrize(
+    "smiles",
+    [
+        r"c1c[nH]cc1",
+        r"c1[sn]ccc1",
+        r"C[N+](c1ccccc1)(C)C.[O-]c1ccccc1",
+        r"[c]1[n]ccc[13c]1",
+        r"c1ccc[nH+]c1",
+        r"c1cc[se]c1.[cH-]1cccc1",
+        r"[13cH]1[c+][n+2][o-2]b1",
+        r"c1ccc2c(c1)[as]c1ccccc12",
+    ],
+)
+@pytest.mark.imported
+def test_single_pass_with_brackets(smiles) -> None:
+    """Check the single pass on SMILES with (multiple) bracket atoms."""
+    assert process_smiles(smiles) == process_smiles_sequential(smiles)
+
+
+@pytest.mark.imported
+def test_saturate_list() -> None:
+    """Check the saturation of a list of SMILES as one buffer."""
+    smiles_strings = [r"c1c[nH]cc1", "", r"CC[C@H](C)O", r"C[N+](c1ccccc1)(C)C"]
+    assert saturate_list(smiles_strings) == [
+        process_smiles(smiles) for smiles in smiles_strings
+    ]
+    assert saturate_list([]) == []
+    assert saturate_list(["C=C\nC#C", "c1ccccc1"]) == ["CC\nCC", "C1CCCCC1"]
+
+
+@pytest.mark.imported
+def test_saturate_many() -> None:
+    """Check the batch-wise saturation of an iterable."""
+    smiles_strings = (f"c1cc{'c' * number}cc1[O-]" for number in range(10))
+    results = list(saturate_many(smiles_strings, batch_size=3))
+
+    assert len(results) == 10
+    assert results[0] == "C1CCCC1[O-]"
+    assert results[9] == f"C1CC{'C' * 9}CC1[O-]"
+
+
+@pytest.mark.imported
+def test_saturate_block() -> None:
+    """Check the saturation of a block of lines held as bytes."""
+    lines = ["c1c[nH]cc1", " C=C\t", "", "C[N+](c1ccccc1)(C)C\r", "[c]1cc[13c]1"]
+    expected = "".join(process_smiles(line.strip()) + "\n" for line in lines)
+
+    assert saturate_block("\n".join(lines).encode()) == expected.encode()
+    assert saturate_block(b"c1ccccc1\nC#C\n") == b"C1CCCCC1\nCC\n"
+    assert saturate_block(b"") == b""
+    assert saturate_block(memoryview(b" c1ccccc1 ")) == b"C1CCCCC1\n"
+
+
+@pytest.mark.parametrize("kind", [bytes, bytearray, memoryview])
+@pytest.mark.imported
+def test_process_smiles_bytes(kind) -> None:
+    """Check the bytes API agrees with `process_smiles` about the demo."""
+    with open(os.path.join("demo", "input.smi"), mode="r", encoding="utf-8") as source:
+        smiles_strings = [line.strip() for line in source]
+    smiles_strings += [
+        r"CCCC[SnH](CCCC)CCCC",
+        r"C[N+](c1ccccc1)(C)C.[O-]c1ccccc1",
+        r"[13cH]1[c+][n+2][o-2]b1",
+        r"c1cc[se]c1.[cH-]1cccc1",
+        r"F/C=C\F",
+        r"c1cc[nH",
+        "",
+    ]
+    for smiles in smiles_strings:
+        result = process_smiles_bytes(kind(smiles.encode()))
+        assert type(result) is bytes
+        assert result == process_smiles(smiles).encode()
+
+
 @pytest.mark.imported
 def test_selfcheck_shlex() -> None:
     """Check if `shlex` works well."""
@@ -154,6 +331,911 @@ def test_read_smiles_from_a_file(capsys) -> None:
     os.remove("example.smi")
 
 
+@pytest.mark.imported
+def test_read_batches_of_complete_lines() -> None:
+    """Check the block-wise reading retains all lines, and their order."""
+    listing = "".join(f"{'C' * number}\n" for number in range(1, 101))
+    batches = list(read_batches(io.StringIO(listing), block_size=50))
+
+    assert len(batches) > 1
+    assert "".join(line for batch in batches for line in batch) == listing
+
+
+@pytest.mark.imported
+def test_saturate_stream() -> None:
+    """Check the streaming saturation from one text stream into an other."""
+    source = io.StringIO("C#CCC\n c1ccncc1 \n\nO=C1NC=CC=C1")
+    sink = io.StringIO()
+    saturate_stream(source, sink)
+
+    assert sink.getvalue() == "CCCC\nC1CCNCC1\n\nOC1NCCCC1\n"
+
+
+@pytest.mark.imported
+def test_write_permanent_record(capsys) -> None:
+    """Check option `--output` writes file `<stem>_sat.smi`."""
+    with open("record.smi", mode="w", encoding="utf-8") as new:
+        new.write("C=C\nc1ccccc1\n")
+    main(["record.smi", "--output"])
+
+    assert capsys.readouterr().out == ""
+    with open("record_sat.smi", mode="r", encoding="utf-8") as report:
+        assert report.read() == "CC\nC1CCCCC1\n"
+
+    os.remove("record.smi")
+    os.remove("record_sat.smi")
+
+
+@pytest.mark.imported
+def test_saturate_batches_in_parallel() -> None:
+    """Check a pool of processes reports blocks in the sequence of input."""
+    batches = [(0, []), (0, ["C=C", "c1ccccc1"]), (1, None)]
+    batches += [(2, [f"C{'=C' * number}"]) for number in range(1, 20)]
+
+    assert list(saturate_batches(batches, jobs=2)) == list(
+        saturate_batches(batches, jobs=1)
+    )
+    assert list(saturate_batches(batches, jobs=2))[1] == (0, ["CC", "C1CCCCC1"])
+
+
+@pytest.mark.imported
+def test_process_files_in_parallel(capsys) -> None:
+    """Check option `--jobs` on multiple files, each with a record."""
+    with open("first.smi", mode="w", encoding="utf-8") as new:
+        new.write("\n".join(["C=C", "C=CC"] * 500))
+    with open("second.smi", mode="w", encoding="utf-8") as new:
+        new.write("c1ccncc1\n")
+    main(["first.smi", "second.smi", "--output", "--jobs", "2"])
+
+    assert capsys.readouterr().out == ""
+    with open("first_sat.smi", mode="r", encoding="utf-8") as report:
+        assert report.read() == "CC\nCCC\n" * 500
+    with open("second_sat.smi", mode="r", encoding="utf-8") as report:
+        assert report.read() == "C1CCNCC1\n"
+
+    for file in ["first.smi", "second.smi", "first_sat.smi", "second_sat.smi"]:
+        os.remove(file)
+
+
+@pytest.mark.imported
+def test_cache_evicts_least_recently_used() -> None:
+    """Check the bounded cache, its eviction, and its statistics."""
+    cache = ScaffoldCache(maxsize=2)
+    assert cache("c1ccccc1") == "C1CCCCC1"
+    assert cache("c1ccncc1") == "C1CCNCC1"
+    assert cache("c1ccccc1") == "C1CCCCC1"
+    assert cache("C=C") == "CC"  # drops pyridine, used less recently
+
+    assert len(cache) == 2
+    assert cache.get("c1ccncc1") is None
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+@pytest.mark.imported
+def test_saturate_batches_with_cache() -> None:
+    """Check a cache in front of the pool of processes."""
+    batches = [(0, ["c1ccccc1", "C=C", "c1ccccc1"]), (1, ["C=C", "c1ccncc1"])]
+    cache = ScaffoldCache(maxsize=10)
+    assert list(saturate_batches(batches, cache=cache)) == list(
+        saturate_batches(batches)
+    )
+    assert (cache.hits, cache.misses) == (2, 3)
+
+    cache = ScaffoldCache(maxsize=10)
+    assert list(saturate_batches(batches, jobs=2, cache=cache)) == list(
+        saturate_batches(batches)
+    )
+    assert len(cache) == 3
+
+
+@pytest.mark.imported
+def test_persistent_cache(tmp_path, monkeypatch) -> None:
+    """Check results persist across runs, until the rules change."""
+    file = str(tmp_path / "cache.db")
+    batches = [(0, ["c1ccccc1", "C=C", "c1ccccc1"])]
+    cache = PersistentCache(file)
+    assert list(saturate_batches(batches, cache=cache)) == list(
+        saturate_batches(batches)
+    )
+    cache.close()
+
+    cache = PersistentCache(file, maxsize=1)
+    assert cache.get_many(["c1ccccc1", "C=C", "c1ccncc1"]) == {
+        "c1ccccc1": "C1CCCCC1",
+        "C=C": "CC",
+    }
+    assert (cache.hits, cache.misses, len(cache)) == (2, 1, 2)
+    cache.close()
+
+    monkeypatch.setattr(
+        "saturate_murcko_scaffolds.saturate_murcko_scaffolds.ENGINE_VERSION", 0
+    )
+    cache = PersistentCache(file)
+    assert len(cache) == 0
+    cache.close()
+
+
+@pytest.mark.imported
+@pytest.mark.parametrize(
+    "name, value",
+    [
+        ("_BRACKET_CONTENT", r"(\d*)([A-Z][a-z]?)(@@?)?(H\d?)?([+-]\d*)?(:\d+)?"),
+        ("_BRACKET_ATOM", r"(\[[^\]]*\])"),
+        ("_SATURATION_TABLE", {}),
+    ],
+)
+def test_rules_fingerprint_covers_patterns(monkeypatch, name, value) -> None:
+    """Check an edit of a pattern or table of the engine alters the rules."""
+    fingerprint = rules_fingerprint()
+    assert rules_fingerprint() == fingerprint
+    monkeypatch.setattr(
+        f"saturate_murcko_scaffolds.saturate_murcko_scaffolds.{name}", value
+    )
+    assert rules_fingerprint() != fingerprint
+
+
+@pytest.mark.imported
+def test_rules_fingerprint_covers_constants() -> None:
+    """Check the constants of the engine's code enter the fingerprint."""
+    from saturate_murcko_scaffolds import saturate_murcko_scaffolds as module
+
+    fingerprint = rules_fingerprint()
+    code = module._saturate_bracket.__code__
+    constants = tuple(
+        "[" if constant == "]" else constant for constant in code.co_consts
+    )
+    assert constants != code.co_consts
+    try:
+        module._saturate_bracket.__code__ = code.replace(co_consts=constants)
+        assert rules_fingerprint() != fingerprint
+    finally:
+        module._saturate_bracket.__code__ = code
+    assert rules_fingerprint() == fingerprint
+
+
+@pytest.mark.imported
+def test_report_cache_to_stderr(capsys) -> None:
+    """Check option `--cache-size` reports hits and misses to stderr."""
+    main(["c1ccccc1", "c1ccccc1", "--cache-size", "8"])
+    captured = capsys.readouterr()
+
+    assert captured.out == "C1CCCCC1\nC1CCCCC1\n"
+    assert captured.err == "cache: 1 hits, 1 misses, 1 of 8 entries used\n"
+
+
+@pytest.mark.imported
+def test_tally_merges_runs_from_disk() -> None:
+    """Check the tally of distinct SMILES with, and without runs on disk."""
+    blocks = [["CC", "CCC", "CC"], ["C1CCCCC1", "CC"], ["CCC", "CCCC"]]
+    in_memory = ScaffoldTally(counts=True, first_line=True)
+    on_disk = ScaffoldTally(counts=True, first_line=True, max_entries=1)
+    for position, block in zip([0, 0, 1], blocks):
+        in_memory.add(block, f"{position}.smi", position)
+        on_disk.add(block, f"{position}.smi", position)
+
+    expected = [
+        ("C1CCCCC1", 1, (0, 4)),
+        ("CC", 3, (0, 1)),
+        ("CCC", 2, (0, 2)),
+        ("CCCC", 1, (1, 2)),
+    ]
+    assert list(in_memory.entries()) == expected
+    assert list(on_disk.entries()) == expected
+    assert on_disk.name(1) == "1.smi"
+
+
+@pytest.mark.imported
+def test_tally_spills_results_with_tabs(capsys, tmp_path) -> None:
+    """Check results with tabulators (e.g., names) survive a run on disk."""
+    listing = tmp_path / "listing.smi"
+    listing.write_text("c1ccccc1\tX1\nC=C\tX2\nCC\tX3\n")
+    main([str(listing), "--unique", "--max-unique", "1"])
+    assert capsys.readouterr().out == "C1CCCCC1\tX1\nCC\tX2\nCC\tX3\n"
+
+    main([str(listing), "--hash", "--counts", "--max-unique", "1"])
+    assert [line.count("\t") for line in capsys.readouterr().out.splitlines()] == [
+        3
+    ] * 3
+
+
+@pytest.mark.parametrize(
+    "option, expected",
+    [
+        ("--unique", "C1CCCCC1\nCC\n"),
+        ("--counts", "C1CCCCC1\t2\nCC\t3\n"),
+        ("--first-line", "C1CCCCC1\targument\t2\nCC\targument\t1\n"),
+    ],
+)
+@pytest.mark.imported
+def test_report_distinct_smiles(capsys, option, expected) -> None:
+    """Check options `--unique`, `--counts`, and `--first-line`."""
+    main(["C=C", "c1ccccc1", "C#C", "C1=CC=CC=C1", "CC", option])
+
+    assert capsys.readouterr().out == expected
+
+
+@pytest.mark.imported
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_first_line_per_input_file(capsys, tmp_path, jobs) -> None:
+    """Check `--first-line` numbers the lines per input file, and names it."""
+    first = tmp_path / "first.smi"
+    first.write_text("C=C\nc1ccccc1\n")
+    second = tmp_path / "second.smi"
+    second.write_text("c1ccncc1\nC#C\n")
+    main(["C1CCCCC1", str(first), str(second), str(second), "--first-line", "-j", jobs])
+
+    assert capsys.readouterr().out == (
+        "C1CCCCC1\targument\t1\n" f"C1CCNCC1\t{second}\t1\n" f"CC\t{first}\t1\n"
+    )
+    with pytest.raises(SystemExit):
+        get_args([str(first), "--first-line", "--strict"])
+
+
+@pytest.mark.imported
+def test_profile_stages(capsys) -> None:
+    """Check the records about the stages of processing a listing."""
+    with open("profiled.smi", mode="w", encoding="utf-8") as new:
+        new.write("C=C\nc1ccccc1\nC=C\n")
+    with profiling() as profile:
+        process_input_files(["profiled.smi"], cache=ScaffoldCache(maxsize=4))
+    capsys.readouterr()
+
+    assert set(profile.stages) == {"read", "cache", "saturate", "write"}
+    assert profile.stages["read"]["chars_in"] == 17
+    assert profile.stages["saturate"]["lines"] == 2
+    assert profile.stages["write"]["lines"] == 3
+    assert "saturate" in profile.report()
+    os.remove("profiled.smi")
+
+
+@pytest.mark.imported
+def test_profile_from_cli(capsys, tmp_path) -> None:
+    """Check option `--profile` reports to stderr only."""
+    main(["C=C", "--profile"])
+    captured = capsys.readouterr()
+
+    assert captured.out == "CC\n"
+    assert captured.err.startswith("stage")
+
+    listing = tmp_path / "listing.smi"
+    listing.write_text("C=C\n")
+    main(["--profile", str(listing), "--profile-format", "json"])
+    captured = capsys.readouterr()
+    assert captured.out == "CC\n"
+    assert json.loads(captured.err)["stages"]["saturate"]["lines"] == 1
+
+
+@pytest.mark.imported
+def test_read_mapped_listings() -> None:
+    """Check the blocks read by memory map end at line feeds."""
+    with open("mapped.smi", mode="wb") as new:
+        new.write(b"".join(b"C" * number + b"\n" for number in range(1, 101)))
+    with open("empty.smi", mode="wb") as new:
+        pass
+    blocks = list(read_mapped_listings(["mapped.smi", "empty.smi"], block_size=64))
+
+    assert blocks[0] == (0, b"") and blocks[-1] == (1, b"")
+    assert all(block and block.endswith(b"\n") for _, block in blocks[1:-1])
+    with open("mapped.smi", mode="rb") as source:
+        assert b"".join(block or b"" for _, block in blocks) == source.read()
+    os.remove("mapped.smi")
+    os.remove("empty.smi")
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+@pytest.mark.imported
+def test_process_files_by_memory_map(capsys, jobs) -> None:
+    """Check option `--mmap` yields the same as the processing as text."""
+    with open("mapped.smi", mode="w", encoding="utf-8") as new:
+        new.write("c1ccccc1\r\n  C=C  \n\n[nH]1cccc1\n\tc1cc[n+]cc1\nC#N")
+    main(["mapped.smi"])
+    as_text = capsys.readouterr().out
+    main(["mapped.smi", "--mmap", "--jobs", jobs])
+
+    assert capsys.readouterr().out == as_text
+    os.remove("mapped.smi")
+
+
+@pytest.mark.imported
+@pytest.mark.parametrize(
+    "option",
+    [["--cache-size", "8"], ["--unique"], ["--lenient"], ["--stages", "stereo"]]
+    + [["--renumber"], ["--hash"], ["--index", "index.db"], ["--incremental"]],
+)
+def test_mmap_rejects_text_options(option) -> None:
+    """Check the options of the processing as text are no silent fallback."""
+    with pytest.raises(SystemExit):
+        get_args(["listing.smi", "--mmap", *option])
+
+
+@pytest.mark.parametrize("options", [[], ["--output"], ["--mmap"], ["--strict"]])
+@pytest.mark.imported
+def test_process_stdin(capsys, monkeypatch, tmp_path, options) -> None:
+    """Check input `-` reads stdin, and reports to the CLI in any case."""
+    listing = tmp_path / "listing.smi"
+    listing.write_text("c1ccccc1\nC=C\n[nH]1cccc1\n", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    with open(listing, mode="r", encoding="utf-8") as stdin:
+        monkeypatch.setattr("sys.stdin", stdin)
+        main(["-", *options])
+
+    assert capsys.readouterr().out == "C1CCCCC1\nCC\n[NH]1CCCC1\n"
+    assert os.listdir(tmp_path) == ["listing.smi"]
+
+
+@pytest.mark.imported
+def test_saturate_table_tsv() -> None:
+    """Check a column of a tab-separated table is saturated."""
+    source = io.StringIO("Name\tScaffold\nbenzene\tc1ccccc1\npyridine\tc1ccncc1\n")
+    sink = io.StringIO()
+
+    assert saturate_table(source, sink, "Scaffold")
+    assert sink.getvalue() == (
+        "Name\tScaffold\tScaffold (saturated)\n"
+        "benzene\tc1ccccc1\tC1CCCCC1\n"
+        "pyridine\tc1ccncc1\tC1CCNCC1\n"
+    )
+
+
+@pytest.mark.imported
+def test_saturate_table_csv_by_number() -> None:
+    """Check a column of a CSV table, selected by its number, is saturated."""
+    source = io.StringIO('Name,Scaffold\n"ethene, C2",C=C\n')
+    sink = io.StringIO()
+
+    assert saturate_table(source, sink, "2", table_format="csv")
+    assert sink.getvalue() == (
+        'Name,Scaffold,Scaffold (saturated)\n"ethene, C2",C=C,CC\n'
+    )
+
+
+@pytest.mark.imported
+def test_saturate_table_dwar() -> None:
+    """Check the header and the blocks after the rows of a .dwar file pass."""
+    header = '<datawarrior-fileinfo>\n<version="3.3">\n</datawarrior-fileinfo>\n'
+    trailer = (
+        "<hitlist data>\n<hitlistName=selected>\n</hitlist data>\n"
+        "<datawarrior properties>\n<columnWidth=80>\n</datawarrior properties>\n"
+    )
+    source = io.StringIO(header + "Scaffold\tcount\nc1ccsc1\t3\n" + trailer)
+    sink = io.StringIO()
+
+    assert saturate_table(source, sink, "Scaffold", table_format="dwar")
+    assert sink.getvalue() == (
+        header
+        + "Scaffold\tcount\tScaffold (saturated)\nc1ccsc1\t3\tC1CCSC1\n"
+        + trailer
+    )
+
+
+@pytest.mark.imported
+def test_saturate_table_missing_column(capsys) -> None:
+    """Check a table lacking the column is reported, and no file written."""
+    with open("table.tsv", mode="w", encoding="utf-8") as new:
+        new.write("Name\tSMILES\nbenzene\tc1ccccc1\n")
+    main(["table.tsv", "--column", "Scaffold", "--output"])
+
+    assert "lacks column Scaffold" in capsys.readouterr().err
+    assert not os.path.exists("table_sat.tsv")
+    os.remove("table.tsv")
+
+
+@pytest.mark.imported
+def test_saturate_table_to_file() -> None:
+    """Check option `--output` with `--column` writes a file `_sat`."""
+    with open("table.tsv", mode="w", encoding="utf-8") as new:
+        new.write("Scaffold\nC#C\n")
+    main(["table.tsv", "--column", "1", "--output"])
+
+    with open("table_sat.tsv", mode="r", encoding="utf-8") as source:
+        assert source.read() == "Scaffold\tScaffold (saturated)\nC#C\tCC\n"
+    os.remove("table.tsv")
+    os.remove("table_sat.tsv")
+
+
+@pytest.mark.imported
+@pytest.mark.parametrize(
+    "option",
+    [["--unique"], ["--counts"], ["--first-line"], ["--jobs", "2"], ["--mmap"]],
+)
+def test_saturate_table_rejects_options(option) -> None:
+    """Check options `--column` would ignore are rejected."""
+    with pytest.raises(SystemExit):
+        get_args(["table.tsv", "--column", "Scaffold", *option])
+
+
+@pytest.mark.parametrize("file", ["listing.smi.gz", "listing"])
+@pytest.mark.imported
+def test_read_compressed_file(capsys, file) -> None:
+    """Check gzip is recognized by the extension, or by magic bytes."""
+    with gzip.open(file, mode="wt", encoding="utf-8") as new:
+        new.write("c1ccccc1\nC=C\n")
+
+    assert compression_of(file) == "gzip"
+    main([file])
+    assert capsys.readouterr().out == "C1CCCCC1\nCC\n"
+    main([file, "--mmap"])
+    assert capsys.readouterr().out == "C1CCCCC1\nCC\n"
+    os.remove(file)
+
+
+@pytest.mark.imported
+def test_write_compressed_file() -> None:
+    """Check option `--compress` about a file read with compression."""
+    with lzma.open("listing.smi.xz", mode="wt", encoding="utf-8") as new:
+        new.write("c1ccncc1\n")
+    main(["listing.smi.xz", "--output", "--compress", "gzip"])
+
+    with gzip.open("listing_sat.smi.gz", mode="rt", encoding="utf-8") as source:
+        assert source.read() == "C1CCNCC1\n"
+    os.remove("listing.smi.xz")
+    os.remove("listing_sat.smi.gz")
+
+
+@pytest.mark.imported
+def test_read_ahead() -> None:
+    """Check items read ahead by a thread, and errors passed on."""
+
+    def failing():
+        yield 1
+        raise OSError("damaged")
+
+    assert list(read_ahead(iter(range(100)), depth=2)) == list(range(100))
+    with pytest.raises(OSError, match="damaged"):
+        list(read_ahead(failing()))
+
+
+@pytest.mark.imported
+def test_incremental_appends_new_results(tmp_path) -> None:
+    """Check option `--incremental` only adds the lines appended."""
+    listing = tmp_path / "listing.smi"
+    record = tmp_path / "listing_sat.smi"
+    listing.write_text("c1ccccc1\nC=C\nc1cc")  # the last line is incomplete
+    main([str(listing), "--incremental"])
+    assert record.read_text() == "C1CCCCC1\nCC\n"
+
+    with open(listing, mode="a", encoding="utf-8") as new:
+        new.write("ncc1\nC#N\n")
+    main([str(listing), "--incremental"])
+    assert record.read_text() == "C1CCCCC1\nCC\nC1CCNCC1\nCN\n"
+
+
+@pytest.mark.imported
+@pytest.mark.parametrize("option", ["--unique", "--counts", "--first-line"])
+def test_incremental_rejects_tally(option) -> None:
+    """Check `--incremental` is no silent full run with a tally option."""
+    with pytest.raises(SystemExit):
+        get_args(["listing.smi", "--incremental", option])
+
+
+@pytest.mark.imported
+def test_incremental_reprocesses_altered_file(tmp_path) -> None:
+    """Check an alteration of the part processed earlier is noticed."""
+    listing = tmp_path / "listing.smi"
+    record = tmp_path / "listing_sat.smi"
+    listing.write_text("c1ccccc1\nC=C\n")
+    main([str(listing), "--incremental"])
+
+    listing.write_text("c1ccncc1\nC=C\nC#C\n")
+    main([str(listing), "--incremental"])
+    assert record.read_text() == "C1CCNCC1\nCC\nCC\n"
+
+
+@pytest.mark.imported
+def test_serve_pipelined_requests(tmp_path) -> None:
+    """Check a server answers pipelined requests in their sequence."""
+    socket_path = str(tmp_path / "server.sock")
+
+    async def exchange() -> list[bytes]:
+        server = await asyncio.start_unix_server(
+            lambda reader, writer: serve_stream(reader, writer, concurrency=2),
+            socket_path,
+        )
+        async with server:
+            reader, writer = await asyncio.open_unix_connection(socket_path)
+            writer.write(b"c1ccccc1\nC=C  C#N\n\n[nH]1cccc1\n")
+            await writer.drain()
+            answers = [await reader.readline() for _ in range(4)]
+            writer.close()
+            return answers
+
+    assert asyncio.run(exchange()) == [
+        b"C1CCCCC1\n",
+        b"CC\tCN\n",
+        b"\n",
+        b"[NH]1CCCC1\n",
+    ]
+
+
+@pytest.mark.imported
+def test_serve_stdin(capsys, monkeypatch) -> None:
+    """Check option `--serve` answers the lines of stdin."""
+    monkeypatch.setattr("sys.stdin", io.StringIO("c1ccncc1\nC=C C#C\n"))
+    main(["--serve"])
+
+    assert capsys.readouterr().out == "C1CCNCC1\nCC\tCC\n"
+
+
+@pytest.mark.imported
+@pytest.mark.parametrize(
+    "options, message",
+    [
+        (["C=C", "--compress", "gzip"], "--compress only applies to --output"),
+        (["C=C", "--errors", "errors.txt"], "--errors only applies to"),
+        (["C=C", "--format", "csv"], "--format only applies to --column"),
+        (["C=C", "--concurrency", "4"], "--concurrency only applies to"),
+        (["--serve", "C=C"], "--serve does not apply to inputs"),
+        (["--socket", "s.sock", "--unique"], "--socket does not apply to --unique"),
+        (["--lookup", "a.db", "C=C", "--unique"], "does not apply to --unique"),
+        (["--lookup", "a.db", "C=C", "--strict"], "to --strict/--lenient"),
+        (["--lookup", "a.db", "C=C", "--cache-size", "8"], "to --cache-size"),
+        (
+            ["t.csv", "--column", "1", "--jobs", "0"],
+            "--column does not apply to --jobs",
+        ),
+    ],
+)
+def test_options_rejected(capsys, options, message) -> None:
+    """Check options which do not apply together are rejected, and named."""
+    with pytest.raises(SystemExit):
+        get_args(options)
+
+    assert message in capsys.readouterr().err
+
+
+@pytest.mark.imported
+def test_result_shape_from_args() -> None:
+    """Check the options shaping results reach the pool as one object."""
+    args = get_args(["C=C", "--stages", "saturate,stereo", "--renumber", "--hash"])
+    shape = ResultShape.from_args(args)
+    assert shape.stages == ("saturate", "stereo") and shape.finished
+    assert (
+        ResultShape.from_args(get_args(["C=C", "--stages", "saturate"])).stages is None
+    )
+
+    batches = [(0, ["F/C=C/F", "C2CC2"])]
+    expected = finish_lines(["FCCF", "C1CC1"], True, True)
+    for jobs in (1, 2):
+        assert list(saturate_batches(batches, jobs, shape=shape)) == [(0, expected)]
+
+
+@pytest.mark.imported
+@pytest.mark.parametrize(
+    "smiles, reason",
+    [
+        ("C[C@H](N)C(=O)O", None),
+        ("C%12CC%12c1ccccc1", None),
+        ("", "empty line"),
+        ("C1CC", "unpaired ring closure 1"),
+        ("C(C", "unbalanced parentheses"),
+        ("C)C(", "unbalanced parentheses"),
+        ("[NH4+", "unbalanced square brackets"),
+        ("CC]", "unbalanced square brackets"),
+        ("C[]", "empty square brackets"),
+        ("C%1C", "invalid ring closure"),
+        ("CCO ethanol", "invalid character ' '"),
+        ("Xe", "invalid character 'X'"),
+        ("C(=O)C=1CC=1", None),
+        ("[NH3+]=C.C#[N]", None),
+        ("#c1ccccc1", "misplaced bond symbol"),
+        ("C==C", "misplaced bond symbol"),
+        ("CC=", "misplaced bond symbol"),
+        ("C=(O)C", "misplaced bond symbol"),
+        ("C.=C", "misplaced bond symbol"),
+    ],
+)
+def test_validate_smiles(smiles, reason) -> None:
+    """Check the syntax check of options `--strict` and `--lenient`."""
+    assert validate_smiles(smiles) == reason
+
+
+@pytest.mark.imported
+def test_saturate_valid_lines() -> None:
+    """Check a block of lines is checked and saturated as the lines are."""
+    lines = ["c1ccccc1\n", "C1CC\n", "C[C@H](N)C(=O)O\n", "C(C\n", "C=C"]
+    expected = ["C1CCCCC1", "", "C[C@H](N)C(O)O", "", "CC"]
+    assert saturate_valid_lines(lines) == expected
+    assert saturate_valid_lines([line.strip() for line in lines]) == expected
+    assert saturate_valid_lines(["c1ccccc1\n", "C=C\n"]) == ["C1CCCCC1", "CC"]
+
+
+@pytest.mark.imported
+@pytest.mark.parametrize(
+    "mode, expected, rejected",
+    [
+        ("--strict", "C1CCCCC1\nCC\n", [2, 3, 4, 5]),
+        ("--lenient", "C1CCCCC1\nCCO\nCC\n", [5]),
+    ],
+)
+def test_validation_modes(capsys, tmp_path, mode, expected, rejected) -> None:
+    """Check options `--strict` and `--lenient` skip and report lines."""
+    listing = tmp_path / "listing.smi"
+    listing.write_text("c1ccccc1\n\n# solvents\nCCO ethanol\nC1CC\nC=C\n")
+    errors = tmp_path / "errors.txt"
+    main([str(listing), mode, "--errors", str(errors)])
+
+    assert capsys.readouterr().out == expected
+    numbers = [int(line.split(":")[1]) for line in errors.read_text().splitlines()]
+    assert numbers == rejected
+
+
+@pytest.mark.imported
+def test_strict_with_filled_cache(capsys, tmp_path) -> None:
+    """Check `--strict` rejects lines cached by an earlier run without it."""
+    listing = tmp_path / "listing.smi"
+    listing.write_text("C1CC\nC(C\nc1ccccc1\n")
+    cache = str(tmp_path / "cache.db")
+    main([str(listing), "--cache-file", cache])
+    assert capsys.readouterr().out == "C1CC\nC(C\nC1CCCCC1\n"
+
+    main([str(listing), "--strict", "--cache-file", cache])
+    captured = capsys.readouterr()
+    assert captured.out == "C1CCCCC1\n"
+    assert "listing.smi:1:" in captured.err and "listing.smi:2:" in captured.err
+    assert "1 hits, 2 misses" in captured.err
+
+
+@pytest.mark.imported
+def test_lenient_skips_commented_smiles(capsys, tmp_path) -> None:
+    """Check SMILES strings commented out are skipped, or rejected."""
+    listing = tmp_path / "listing.smi"
+    listing.write_text("#c1ccccc1\n  #CCO ethanol\nC=C\n")
+    main([str(listing), "--lenient"])
+    captured = capsys.readouterr()
+    assert (captured.out, captured.err) == ("CC\n", "")
+
+    main([str(listing), "--strict"])
+    captured = capsys.readouterr()
+    assert captured.out == "CC\n"
+    assert captured.err.count("misplaced bond symbol") == 2
+
+
+@pytest.mark.imported
+@pytest.mark.parametrize(
+    "smiles, saturated, skeleton",
+    [
+        ("c1ccc2[nH]ccc2c1", "C1CCC2[NH]CCC2C1", "C1CCC2CCCC2C1"),
+        ("O=C1CCC(=O)N1", "OC1CCC(O)N1", "CC1CCC(C)C1"),
+        ("ClC(Br)=C/F", "ClC(Br)CF", "CC(C)CC"),
+        (
+            "C[N+](C)(C)C.[O-]c1ccccc1",
+            "C[N+](C)(C)C.[O-]C1CCCCC1",
+            "CC(C)(C)C.CC1CCCCC1",
+        ),
+        ("[2H]c1cc[se]c1", "[2H]C1CC[Se]C1", "[2H]C1CCCC1"),
+        ("[C@@H]1(O)CC1", "[C@@H]1(O)CC1", "C1(C)CC1"),
+    ],
+)
+def test_process_smiles_levels(smiles, saturated, skeleton) -> None:
+    """Check the levels of scaffold, saturated scaffold, and skeleton."""
+    assert process_smiles_levels(smiles) == (smiles, saturated, skeleton)
+    assert process_smiles_levels(smiles, ["skeleton", "scaffold"]) == (skeleton, smiles)
+    assert process_smiles_levels(smiles, ["saturated"]) == (process_smiles(smiles),)
+
+
+@pytest.mark.imported
+def test_saturate_levels() -> None:
+    """Check the levels of a list equal the ones of each entry."""
+    smiles_strings = ["c1ccncc1", "", "C=C\nC#C", "c1cc[nH]c1"]
+    levels = ["saturated", "skeleton"]
+
+    assert saturate_levels(smiles_strings, levels) == [
+        process_smiles_levels(smiles, levels) for smiles in smiles_strings
+    ]
+    assert saturate_levels([]) == []
+    with pytest.raises(ValueError):
+        process_smiles_levels("c1ccccc1", ["generic"])
+
+
+@pytest.mark.imported
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_levels_cli(capsys, tmp_path, jobs) -> None:
+    """Check option `--levels` reports tab-separated columns."""
+    listing = tmp_path / "listing.smi"
+    listing.write_text("c1ccncc1\nO=C1CCCC1\n")
+    main(["C=C", str(listing), "--levels", "skeleton,scaffold", "--jobs", jobs])
+
+    assert capsys.readouterr().out == (
+        "CC\tC=C\nC1CCCCC1\tc1ccncc1\nCC1CCCC1\tO=C1CCCC1\n"
+    )
+    with pytest.raises(SystemExit):
+        get_args(["C=C", "--levels", "saturated,generic"])
+    with pytest.raises(SystemExit):
+        get_args(["C=C", "--levels", "skeleton", "--cache-size", "8"])
+
+
+@pytest.mark.imported
+@pytest.mark.parametrize(
+    "stages, smiles, expected",
+    [
+        (("stereo",), "F/C=C\\C[C@@H](N)[C@H]1CC1", "FC=CC[CH](N)[CH]1CC1"),
+        (("isotopes",), "[13CH3]c1cc[2H]cc1", "[CH3]c1cc[H]cc1"),
+        (("isotopes",), "[13c]1ccccc1", "c1ccccc1"),
+        (("charges",), "C[N+](C)(C)C.[O-]C", "CN(C)(C)C.OC"),
+        (("charges",), "[Fe+2].[cH-]1cccc1", "[Fe].[cH]1cccc1"),
+        (("hydrogens",), "c1cc[nH]c1.[CH4]", "c1ccnc1.C"),
+        (("saturate", "hydrogens", "charges"), "c1cc[nH+]cc1", "C1CCNCC1"),
+        (STAGES, "[13C@@H]1(O)[C@H](Cl)C=C1", "C1(O)C(Cl)CC1"),
+        (("saturate", "stereo"), "[C]", "[C]"),
+        (("saturate", "charges"), "[nH+", "[NH"),
+    ],
+)
+def test_compile_stages(stages, smiles, expected) -> None:
+    """Check the stages, alone and fused, and their sequence."""
+    assert compile_stages(stages)(smiles) == expected
+    assert compile_stages(stages[::-1])(smiles) == expected
+
+
+@pytest.mark.imported
+def test_compile_stages_saturate() -> None:
+    """Check the stage `saturate` alone equals `process_smiles`."""
+    with open(os.path.join("demo", "input.smi"), mode="r", encoding="utf-8") as source:
+        smiles_strings = [line.strip() for line in source]
+    smiles_strings += ["[13cH]1[c+][n+2][o-2]b1", "c1cc[se]c1.[cH-]1cccc1", "[c=H]"]
+
+    assert transform_list(smiles_strings, ("saturate",)) == [
+        process_smiles(smiles) for smiles in smiles_strings
+    ]
+    assert compile_stages(("saturate",)) is compile_stages(("saturate",))
+    with pytest.raises(ValueError):
+        compile_stages(("saturate", "aromaticity"))
+
+
+@pytest.mark.imported
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_stages_cli(capsys, tmp_path, jobs) -> None:
+    """Check option `--stages` about SMILES and input files."""
+    listing = tmp_path / "listing.smi"
+    listing.write_text("[13C@@H]1CC[NH3+]C1\nc1ccc[nH]1\n")
+    stages = "saturate,stereo,isotopes,charges,hydrogens"
+    main(["[O-]c1ccccc1", str(listing), "--stages", stages, "--jobs", jobs])
+
+    assert capsys.readouterr().out == "OC1CCCCC1\nC1CCNC1\nC1CCCN1\n"
+    with pytest.raises(SystemExit):
+        get_args(["C=C", "--stages", "saturate,aromaticity"])
+    with pytest.raises(SystemExit):
+        get_args(["C=C", "--stages", "stereo", "--levels", "saturated"])
+
+
+@pytest.mark.imported
+@pytest.mark.parametrize(
+    "smiles, expected",
+    [
+        ("C2CCCCC2", "C1CCCCC1"),
+        ("C3CC2.C2CC3", "C1CC2.C2CC1"),
+        ("C1CC3CC1C2CC23", "C1CC2CC1C1CC12"),
+        ("C%12CC%12C1CC1", "C1CC1C1CC1"),
+        ("[13CH]2CC[NH3+]C2", "[13CH]1CC[NH3+]C1"),
+        ("C1CCCCC1", "C1CCCCC1"),
+        ("CC", "CC"),
+        ("", ""),
+    ],
+)
+def test_renumber_rings(smiles, expected) -> None:
+    """Check the ring closures take the lowest number free."""
+    assert renumber_rings(smiles) == expected
+    assert renumber_rings(expected) == expected
+
+
+@pytest.mark.imported
+def test_scaffold_hash() -> None:
+    """Check the hash is stable, and its column of fixed width."""
+    assert scaffold_hash("C1CCCCC1") == 0xA8257DBCC37F9512
+    assert scaffold_hash("C1CCCCC1") != scaffold_hash("C1CCNCC1")
+    assert finish_lines(["C2CC2", ""], True, True) == ["C1CC1\t046183f5344b778b", ""]
+    assert finish_lines(["C2CC2"], True, False) == ["C1CC1"]
+
+
+@pytest.mark.imported
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_renumber_hash_cli(capsys, tmp_path, jobs) -> None:
+    """Check options `--renumber` and `--hash` about SMILES and input files."""
+    listing = tmp_path / "listing.smi"
+    listing.write_text("c2ccccc2\n\nC3CC3\n")
+    main(["c1ccccc1", str(listing), "--renumber", "--hash", "--jobs", jobs])
+
+    key = f"{scaffold_hash('C1CCCCC1'):016x}"
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[:3] == [f"C1CCCCC1\t{key}"] * 2 + [""]
+    assert lines[3] == f"C1CC1\t{scaffold_hash('C1CC1'):016x}"
+    with pytest.raises(SystemExit):
+        get_args(["C=C", "--hash", "--levels", "saturated"])
+
+
+@pytest.mark.imported
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_renumber_hash_with_cache(capsys, tmp_path, jobs) -> None:
+    """Check results cached about SMILES of the CLI are finished for files."""
+    listing = tmp_path / "listing.smi"
+    listing.write_text("c2ccccc2\nC3CC3\n")
+    options = ["--cache-size", "8", "--renumber", "--hash", "--jobs", jobs]
+    main(["c2ccccc2", str(listing), str(listing), *options])
+
+    hexagon = f"C1CCCCC1\t{scaffold_hash('C1CCCCC1'):016x}"
+    triangle = f"C1CC1\t{scaffold_hash('C1CC1'):016x}"
+    assert capsys.readouterr().out.splitlines() == [hexagon, *[hexagon, triangle] * 2]
+
+
+@pytest.mark.imported
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_index_lookup(capsys, tmp_path, jobs) -> None:
+    """Check an index is built while saturating, and queried."""
+    first = tmp_path / "first.smi"
+    first.write_text("c2ccccc2\n\nC1=CC=NC=C1\n")
+    second = tmp_path / "second.smi"
+    second.write_text("C1CCCCC1\n")
+    index = str(tmp_path / "index.db")
+    main([str(first), str(second), "--index", index, "--renumber", "--jobs", jobs])
+
+    assert capsys.readouterr().out == "C1CCCCC1\n\nC1CCNCC1\nC1CCCCC1\n"
+    assert list(lookup_scaffolds(index, ["C2=CC=CC=C2", "C1CCOC1"])) == [
+        ("C2=CC=CC=C2", str(first), 1),
+        ("C2=CC=CC=C2", str(second), 1),
+    ]
+    queries = tmp_path / "queries.smi"
+    queries.write_text("c1ccncc1 pyridine\n\n")
+    main(["--lookup", index, str(queries)])
+    assert capsys.readouterr().out == f"c1ccncc1\t{first}\t3\n"
+
+    main([str(second), str(second), "--index", index])
+    capsys.readouterr()
+    assert list(lookup_scaffolds(index, ["c1ccccc1"])) == [
+        ("c1ccccc1", str(second), 1),
+        ("c1ccccc1", str(second), 1),
+    ]
+
+    with pytest.raises(SystemExit):
+        main(["--lookup", str(first), "C1CCCCC1"])
+    with pytest.raises(SystemExit):
+        get_args(["C=C", "--index", index, "--hash"])
+    with pytest.raises(SystemExit):
+        get_args(["C=C", "--lookup", index, "--output"])
+
+
+@pytest.mark.imported
+def test_index_replaced_once_complete(tmp_path) -> None:
+    """Check an incomplete index leaves the earlier one in place."""
+    file = str(tmp_path / "index.db")
+    index = ScaffoldIndex(file)
+    index.add(0, "first.smi", ["C1CCCCC1"])
+    index.add(0, "first.smi", ["CC"])
+    index.close()
+    assert index.report() == f"index: 2 entries in {file}"
+
+    index = ScaffoldIndex(file)
+    index.add(0, "second.smi", ["CC"])
+    index.discard()
+    assert list(lookup_scaffolds(file, ["C=C"])) == [("C=C", "first.smi", 2)]
+    assert not os.path.exists(file + ".tmp")
+
+
+@pytest.mark.imported
+def test_import_time(tmp_path) -> None:
+    """Check the import stays within its budget (README, start-up time)."""
+    module = "saturate_murcko_scaffolds.saturate_murcko_scaffolds"
+    environment = dict(os.environ, PYTHONPATH=os.path.join(ROOT, "src"))
+    environment.pop("PYTHONDONTWRITEBYTECODE", None)
+    command = [sys.executable, "-X", f"pycache_prefix={tmp_path}"]
+    check = f"import sys, {module}; print(*sys.modules)"
+
+    modules = subprocess.run(
+        command + ["-c", check], env=environment, capture_output=True, text=True
+    ).stdout.split()
+    assert not {"argparse", "asyncio", "re", "sqlite3"} & set(modules)
+
+    timings = []
+    for _ in range(3):  # bytecode cached by the first run
+        report = subprocess.run(
+            command + ["-X", "importtime", "-c", f"import {module}"],
+            env=environment,
+            capture_output=True,
+            text=True,
+        ).stderr
+        lines = [line for line in report.splitlines() if line.endswith(f" {module}")]
+        timings.append(int(lines[0].split("|")[1]))
+    assert min(timings) < IMPORT_TIME_BUDGET_US
+
+
 @pytest.mark.imported
 def test_sequentially_process_smiles_from_cli(capsys) -> None:
     """Check processing SMILES from CLI by the main function."""